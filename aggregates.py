@@ -0,0 +1,279 @@
+import os
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from skills import default_matcher
+from locking import file_lock, temp_path
+
+# Counts are kept per (dimension, value, day, source). The 'postings'
+# dimension has an empty value and counts all postings, for the timeline.
+DIMENSIONS = {'title': 'job_title', 'location': 'location'}
+
+SUMMARY_SCHEMA = pa.schema([
+    ('dimension', pa.string()),
+    ('value', pa.string()),
+    ('scrapped_date', pa.date32()),
+    ('source', pa.string()),
+    ('count', pa.int64()),
+])
+SUMMARY_COLUMNS = SUMMARY_SCHEMA.names
+KEY_COLUMNS = SUMMARY_COLUMNS[:-1]
+
+# Per-part summaries live in a subdirectory of the job store, named after their part
+SUMMARY_SUBDIR = '_summaries'
+# Lock file held while the counters are updated (scrapers and dashboards both apply parts)
+COUNTERS_LOCK = '_counters.lock'
+
+
+def summarize(df):
+    """Count postings per day and source by title, location and skill"""
+    df = df.reset_index(drop=True)
+    df['scrapped_date'] = pd.to_datetime(df['scrapped_date'], errors='coerce').dt.date
+    if 'source' not in df.columns:
+        df['source'] = None
+    keys = ['scrapped_date', 'source']
+    frames = []
+
+    def add(dimension, values):
+        counts = (pd.DataFrame({'value': values, 'scrapped_date': df['scrapped_date'], 'source': df['source']})
+                  .dropna(subset=['value'])
+                  .groupby(['value'] + keys, dropna=False, observed=True).size().reset_index(name='count'))
+        counts['dimension'] = dimension
+        frames.append(counts)
+
+    add('postings', pd.Series('', index=df.index))
+    for dimension, column in DIMENSIONS.items():
+        if column in df.columns:
+            add(dimension, df[column])
+
+    if 'skills' in df.columns:
+        # Match each distinct skills text once, then count one hit per posting and skill
+        texts = df['skills'].dropna().astype(str)
+        matcher = default_matcher()
+        found = {text: matcher.extract(text) for text in texts.unique()}
+        skills = texts.map(found).explode().dropna()
+        skill_rows = df.loc[skills.index, keys].assign(value=skills.values)
+        counts = skill_rows.groupby(['value'] + keys, dropna=False, observed=True).size().reset_index(name='count')
+        counts['dimension'] = 'skill'
+        frames.append(counts)
+
+    summary = pd.concat(frames, ignore_index=True)
+    return summary[SUMMARY_COLUMNS].astype({'count': 'int64'})
+
+
+def combine(summaries):
+    """Add up summaries that may share keys"""
+    summaries = [s for s in summaries if len(s)]
+    if not summaries:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS).astype({'count': 'int64'})
+    combined = pd.concat(summaries, ignore_index=True)
+    combined = combined.groupby(KEY_COLUMNS, dropna=False, as_index=False)['count'].sum()
+    return combined[combined['count'] != 0].reset_index(drop=True)
+
+
+def summary_path(part_path):
+    store_dir, name = os.path.split(part_path)
+    return os.path.join(store_dir, SUMMARY_SUBDIR, name)
+
+
+def write_summary(df, part_path):
+    """Materialize the summary of a store part next to it"""
+    path = summary_path(part_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(summarize(df), schema=SUMMARY_SCHEMA, preserve_index=False)
+    tmp = temp_path(path)
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+class Counters:
+    """Running dashboard counts for a job store, updated one batch at a time.
+
+    Each store part is a batch. apply() adds a batch's summary to the
+    counters and retract() subtracts it again; both are no-ops when the
+    batch is already (or not) applied, so re-running an ingest is safe.
+    Counts are sharded by day, one Parquet file per scrapped_date, so a
+    batch only reads and rewrites the days it has postings on. Each shard
+    lists the batches applied to it in its metadata, so a shard's counts
+    and batches never disagree after a crash; _batches.json lists the
+    batches applied to all their days. Writers hold locked() around
+    creating a Counters and applying or retracting batches.
+    """
+
+    DIR_NAME = '_counters'
+    BATCHES_NAME = '_batches.json'
+    # Single-file counters of earlier versions; they are rebuilt from the part summaries
+    LEGACY_NAME = '_counters.parquet'
+
+    def __init__(self, store_dir):
+        self.dir = os.path.join(store_dir, self.DIR_NAME)
+        self.batches_path = os.path.join(self.dir, self.BATCHES_NAME)
+        self.batches = set()
+        if os.path.exists(self.batches_path):
+            with open(self.batches_path, encoding='utf-8') as f:
+                self.batches = set(json.load(f))
+        legacy = os.path.join(store_dir, self.LEGACY_NAME)
+        if os.path.exists(legacy):
+            try:
+                os.remove(legacy)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def locked(store_dir):
+        """Lock out other counter writers, in this process or another one"""
+        return file_lock(os.path.join(store_dir, COUNTERS_LOCK))
+
+    def _shard_path(self, day):
+        return os.path.join(self.dir, f"day={day}.parquet")
+
+    def _save_batches(self):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = temp_path(self.batches_path)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(sorted(self.batches), f)
+        os.replace(tmp, self.batches_path)
+
+    def _update(self, batch_id, summary, sign):
+        """Merge sign * summary into the shard of each day it has rows for"""
+        os.makedirs(self.dir, exist_ok=True)
+        days = pd.to_datetime(summary['scrapped_date']).dt.strftime('%Y-%m-%d').fillna('none')
+        for day, rows in summary.groupby(days):
+            path = self._shard_path(day)
+            applied, current = set(), rows.iloc[:0]
+            if os.path.exists(path):
+                table = pq.read_table(path)
+                applied = set(json.loads(table.schema.metadata[b'batches']))
+                current = table.to_pandas()
+            if (batch_id in applied) == (sign > 0):
+                continue
+            merged = combine([current, rows.assign(count=rows['count'] * sign)])
+            if day == 'none':
+                # An all-missing date column comes out of the groupby as float NaN
+                merged['scrapped_date'] = None
+            if sign > 0:
+                applied.add(batch_id)
+            else:
+                applied.discard(batch_id)
+            if not applied:
+                os.remove(path)
+                continue
+            table = pa.Table.from_pandas(merged, schema=SUMMARY_SCHEMA, preserve_index=False)
+            table = table.replace_schema_metadata({'batches': json.dumps(sorted(applied))})
+            tmp = temp_path(path)
+            pq.write_table(table, tmp)
+            os.replace(tmp, path)
+
+    def apply(self, batch_id, summary):
+        """Add a batch's summary; returns False if it was already applied"""
+        if batch_id in self.batches:
+            return False
+        # Days first: a crash in between leaves the batch listed as not applied, and re-applying skips the done days
+        self._update(batch_id, summary, 1)
+        self.batches.add(batch_id)
+        self._save_batches()
+        return True
+
+    def retract(self, batch_id, summary):
+        """Subtract a previously applied batch; returns False if it was not applied"""
+        if batch_id not in self.batches:
+            return False
+        self.batches.discard(batch_id)
+        self._save_batches()
+        self._update(batch_id, summary, -1)
+        return True
+
+    def to_frame(self):
+        names = os.listdir(self.dir) if os.path.isdir(self.dir) else []
+        paths = sorted(os.path.join(self.dir, name) for name in names
+                       if name.startswith('day=') and name.endswith('.parquet'))
+        if not paths:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS).astype({'count': 'int64'})
+        return pq.read_table(paths, schema=SUMMARY_SCHEMA).to_pandas()
+
+
+def read_summary(part_path):
+    """The materialized summary of a store part, backfilling it when missing"""
+    path = summary_path(part_path)
+    if not os.path.exists(path):
+        write_summary(pq.read_table(part_path).to_pandas(), part_path)
+    return pq.read_table(path).to_pandas()
+
+
+def apply_part(part_path):
+    """Add a newly written store part to the store's counters"""
+    store_dir = os.path.dirname(part_path)
+    with Counters.locked(store_dir):
+        Counters(store_dir).apply(os.path.basename(part_path), read_summary(part_path))
+
+
+def retract_part(part_path):
+    """Remove a part's counts from the store's counters"""
+    store_dir = os.path.dirname(part_path)
+    with Counters.locked(store_dir):
+        Counters(store_dir).retract(os.path.basename(part_path), read_summary(part_path))
+
+
+def load_summaries(store_dir):
+    """Current counters of the store.
+
+    Parts that were never applied (e.g. a writer crashed, or wrote before
+    counters existed) are applied, and batches whose part was deleted by
+    hand are retracted, so the counters always match the parts on disk.
+    """
+    import job_store
+    counters = Counters(store_dir)
+    parts = {os.path.basename(path): path for path in job_store.part_files(store_dir)}
+
+    def orphans():
+        return [batch_id for batch_id in counters.batches - set(parts)
+                if os.path.exists(os.path.join(store_dir, SUMMARY_SUBDIR, batch_id))]
+
+    if set(parts) - counters.batches or orphans():
+        with Counters.locked(store_dir):
+            # Another writer may have caught up while we waited for the lock
+            counters = Counters(store_dir)
+            # Only parts not applied yet have their summaries read
+            for batch_id in sorted(set(parts) - counters.batches):
+                counters.apply(batch_id, read_summary(parts[batch_id]))
+            for batch_id in orphans():
+                orphan = os.path.join(store_dir, SUMMARY_SUBDIR, batch_id)
+                counters.retract(batch_id, pq.read_table(orphan).to_pandas())
+    return counters.to_frame()
+
+
+def top_values(summary, dimension, n=5):
+    """Most frequent values of a dimension as a Series, like value_counts().head(n)"""
+    rows = summary[summary['dimension'] == dimension]
+    counts = rows.groupby('value')['count'].sum().sort_values(ascending=False, kind='stable')
+    counts = counts.rename_axis(dimension)
+    return counts.head(n) if n else counts
+
+
+def timeline(summary):
+    """Postings per day"""
+    rows = summary[(summary['dimension'] == 'postings') & summary['scrapped_date'].notna()]
+    daily = rows.groupby('scrapped_date')['count'].sum().sort_index()
+    daily.index = pd.to_datetime(daily.index)
+    return daily.rename_axis('Date').reset_index(name='Postings')
+
+
+def add_to_timeline(daily, counts, sign=1):
+    """Add {day: count} to a timeline() frame in place of rebuilding it; new days become new points"""
+    daily = daily.copy()
+    rows = {day: i for i, day in enumerate(daily['Date'])}
+    new = []
+    for day, count in counts.items():
+        day = pd.Timestamp(day)
+        if day in rows:
+            daily.loc[rows[day], 'Postings'] += sign * count
+        else:
+            new.append((day, sign * count))
+    if new:
+        daily = pd.concat([daily, pd.DataFrame(new, columns=['Date', 'Postings'])], ignore_index=True)
+        # Late-arriving days in the past still need to be put in order
+        if not daily['Date'].is_monotonic_increasing:
+            daily = daily.sort_values('Date', kind='stable')
+    return daily[daily['Postings'] != 0].reset_index(drop=True)
@@ -1,80 +1,174 @@
+import os
+import threading
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from collections import Counter
-
-def clean_and_standardize(df, source):
-    # Standardize column names
-    rename_map = {
-        'title': 'job_title',
-        'company': 'company_name',
-        'date posted': 'scrapped_date',
-        'date_posted': 'scrapped_date'
-    }
-    df = df.rename(columns=rename_map)
-    # Ensure all columns exist
-    for col in ['job_title', 'company_name', 'location', 'skills', 'scrapped_date']:
-        if col not in df.columns:
-            df[col] = None
-    # Standardize date format
-    df['scrapped_date'] = pd.to_datetime(df['scrapped_date'], errors='coerce').dt.date
-    # Fill missing values
-    df = df.fillna('')
-    # Add source column
-    df['source'] = source
-    return df
-
-# Clean and load data from original files
-df_linkedin = pd.read_csv('cleaned_linkedin_jobs.csv')
-df_indeed = pd.read_csv('cleaned_indeed_jobs.csv')
-
-df_linkedin = clean_and_standardize(df_linkedin, 'LinkedIn')
-df_indeed = clean_and_standardize(df_indeed, 'Indeed')
-
-# Save cleaned data to new files
-df_linkedin.to_csv('cleaned_linkedin_jobs.csv', index=False)
-df_indeed.to_csv('cleaned_indeed_jobs.csv', index=False)
-
-# Load cleaned data
-df_linkedin_clean = pd.read_csv('cleaned_linkedin_jobs.csv')
-df_indeed_clean = pd.read_csv('cleaned_indeed_jobs.csv')
-
-# Combine cleaned data
-df_combined = pd.concat([df_linkedin_clean, df_indeed_clean], ignore_index=True)
-df = df_combined.copy()
-df['scrapped_date'] = pd.to_datetime(df['scrapped_date'], errors='coerce')
+from data_loader import load_jobs, load_summary, load_clusters
+import aggregates
+import dedupe
+from locations import group_by_city
+from changes import Subscriber
+from instrument import span
+
+# JOB_BACKEND=sqlite queries the embedded database (job_db.py) and enables filters;
+# the default reads the counts materialized at ingest time
+BACKEND = os.environ.get('JOB_BACKEND', 'summary')
+# How often the live sections check the job store's change feed (seconds)
+POLL_SECONDS = float(os.environ.get('DASHBOARD_POLL_SECONDS', 5))
 
 st.title("📊 Real-Time Job Trend Analyzer")
 
+# Count the same role posted on several boards (or reposted) once in the title chart
+count_clusters = st.sidebar.checkbox("Count near-duplicate postings once")
+
+if BACKEND == 'sqlite':
+    from job_db import open_db
+
+    @st.cache_resource
+    def shared_db():
+        """One connection for every session and rerun, with the change feed that keeps it synced"""
+        # Follow the feed from before the first sync, so no part is missed in between
+        feed = Subscriber()
+        return open_db(), feed, threading.Lock()
+
+    def synced_db():
+        """The shared database, after loading any parts published since it was last synced"""
+        db, feed, lock = shared_db()
+        with lock:
+            if feed.poll():
+                db.sync()
+        return db
+
+    db = synced_db()
+
+    # --- Filters (pushed down into SQL) ---
+    st.sidebar.header("Filters")
+    first, last = db.date_range()
+    dates = st.sidebar.date_input("Posted between", (first, last)) if first else ()
+    filters = {
+        'start': dates[0] if len(dates) > 0 else None,
+        'end': dates[1] if len(dates) > 1 else None,
+        'locations': st.sidebar.multiselect("City", db.distinct('location')),
+        'sources': st.sidebar.multiselect("Source", db.distinct('source')),
+        'skill': st.sidebar.selectbox("Skill", [''] + db.distinct('skill')) or None,
+    }
+
+    def top_values(dimension, n=5):
+        if dimension == 'title' and count_clusters:
+            df = db.postings(['job_title', 'company_name'], **filters)
+            return dedupe.top_titles(df, dedupe.cluster_ids(df), n)
+        return db.top_values(dimension, n, **filters)
+
+    def timeline():
+        return db.timeline(**filters)
+
+    def drill_down(title):
+        return db.postings(['job_title', 'company_name', 'location', 'scrapped_date', 'source'],
+                           title=title, **filters)
+else:
+    # The counts materialized at ingest time, read through load_summary() on every
+    # call (memoized until the data changes) so fragment reruns see new parts
+
+    def top_values(dimension, n=5):
+        if dimension == 'title' and count_clusters:
+            return dedupe.top_titles(load_jobs(columns=['job_title', 'company_name']), load_clusters(), n)
+        return aggregates.top_values(load_summary(), dimension, n)
+
+    def timeline():
+        return aggregates.timeline(load_summary())
+
+    def drill_down(title):
+        df = load_jobs(columns=['job_title', 'company_name', 'location', 'scrapped_date', 'source'])
+        return df[df['job_title'] == title]
+
+# A full run (first load, or a sidebar change) computes every section afresh and
+# follows the change feed from here on. Afterwards each section is a fragment that
+# reruns on its own and recomputes only when a new part touches its dimension.
+st.session_state['sections'] = {}
+st.session_state['subscribers'] = {}
+
+
+def new_events(section):
+    """Store changes published since this section last looked"""
+    subscriber = st.session_state['subscribers'].setdefault(section, Subscriber())
+    events = subscriber.poll()
+    if events and BACKEND == 'sqlite':
+        synced_db()
+    return events
+
+
+def section_data(section, dimension, compute):
+    """The section's cached result, recomputed when it is missing or its dimension changed"""
+    events = new_events(section)
+    sections = st.session_state['sections']
+    if section not in sections or any(dimension in event['dimensions'] for event in events):
+        sections[section] = compute()
+    return sections[section]
+
+
 # --- Top 5 Job Titles ---
-st.subheader("💼 Top 5 Job Titles")
-top_titles = df['job_title'].value_counts().head(5)
-st.bar_chart(top_titles)
+@st.fragment(run_every=POLL_SECONDS)
+def titles_section():
+    with span('dashboard_section', section='titles'):
+        st.subheader("💼 Top 5 Job Titles")
+        st.bar_chart(section_data('titles', 'title', lambda: top_values('title')))
+
 
 # --- Top 5 Hiring Cities ---
-st.subheader("📍 Top Hiring Cities")
-top_cities = df['location'].value_counts().head(5)
-st.bar_chart(top_cities)
+@st.fragment(run_every=POLL_SECONDS)
+def cities_section():
+    with span('dashboard_section', section='cities'):
+        st.subheader("📍 Top Hiring Cities")
+        # Raw location strings are folded into cities first ("New York, NY 10019" -> "New York, New York")
+        st.bar_chart(section_data('cities', 'location',
+                                  lambda: group_by_city(top_values('location', n=None)).head(5)))
 
-# --- Most Common Skills ---
-st.subheader("🛠️ Most In-Demand Skills")
-skill_keywords = ['Python', 'Java', 'SQL', 'Excel', 'AWS', 'JavaScript', 'C++', 'Power BI', 'Pandas', 'NumPy']
-skill_counter = Counter()
 
-for skills_text in df['skills'].dropna():
-    for skill in skill_keywords:
-        if skill.lower() in skills_text.lower():
-            skill_counter[skill] += 1
+# --- Most Common Skills ---
+@st.fragment(run_every=POLL_SECONDS)
+def skills_section():
+    with span('dashboard_section', section='skills'):
+        st.subheader("🛠️ Most In-Demand Skills")
+        skill_counts = section_data('skills', 'skill', lambda: top_values('skill', n=None))
+        skills_df = skill_counts.rename_axis('Skill').reset_index(name='Count')
 
-skills_df = pd.DataFrame(skill_counter.items(), columns=['Skill', 'Count']).sort_values(by='Count', ascending=False)
+        fig_skills = px.bar(skills_df, x='Skill', y='Count', title="Top Skills in Demand")
+        st.plotly_chart(fig_skills)
 
-fig_skills = px.bar(skills_df, x='Skill', y='Count', title="Top Skills in Demand")
-st.plotly_chart(fig_skills)
 
 # --- Posting Trends Over Time ---
-st.subheader("📈 Job Postings Over Time")
-timeline = df['scrapped_date'].value_counts().sort_index()
-timeline_df = timeline.reset_index()
-timeline_df.columns = ['Date', 'Postings']
-fig_timeline = px.line(timeline_df, x='Date', y='Postings', title="Job Postings Trend")
-st.plotly_chart(fig_timeline)
\ No newline at end of file
+@st.fragment(run_every=POLL_SECONDS)
+def timeline_section():
+    with span('dashboard_section', section='timeline'):
+        st.subheader("📈 Job Postings Over Time")
+        events = new_events('timeline')
+        sections = st.session_state['sections']
+        imported = any(event['action'] == 'import' for event in events)
+        if 'timeline' not in sections or imported or (events and BACKEND == 'sqlite'):
+            # Filtered SQL timelines are cheap to query again. CSV imports are rebuilt
+            # too: a dashboard started before the store existed already counts the CSVs
+            sections['timeline'] = timeline()
+        else:
+            # Add each new part's postings per day to the points already shown
+            for event in events:
+                sign = -1 if event['action'] == 'retract' else 1
+                sections['timeline'] = aggregates.add_to_timeline(sections['timeline'], event['timeline'], sign)
+
+        fig_timeline = px.line(sections['timeline'], x='Date', y='Postings', title="Job Postings Trend")
+        st.plotly_chart(fig_timeline)
+
+
+# --- Drill-down (the only section that reads raw postings) ---
+@st.fragment
+def drill_down_section():
+    with span('dashboard_section', section='drill_down'):
+        st.subheader("🔎 Drill Down")
+        drill_title = st.selectbox("Job title", [''] + list(top_values('title', n=50).index))
+        if drill_title:
+            st.dataframe(drill_down(drill_title))
+
+
+titles_section()
+cities_section()
+skills_section()
+timeline_section()
+drill_down_section()
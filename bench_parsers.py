@@ -0,0 +1,230 @@
+"""Offline benchmark for the job card extractors.
+
+Runs every extractor against saved listing pages and reports pages/sec,
+cards/sec, peak memory and recall against golden outputs. No network or
+browser is needed: the bulk card extractors parse the saved HTML with the
+same selector definitions they run in the browser, and per-element
+WebDriver lookups run against OfflineDriver, which answers find_element(s)
+calls from the saved HTML.
+
+Fixtures live in bench_fixtures/<site>/<name>.html, with the expected
+records in <name>.golden.json next to them. The debug pages the Indeed
+scrapers save (indeed_page_source.html, indeed_full_page.html) are
+benchmarked too when present, without a recall figure.
+
+Usage: python bench_parsers.py [--fixtures DIR] [--repeat N] [--min-recall R]
+"""
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import tracemalloc
+import lxml.html
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+from card_selectors import parse_cards
+
+FIXTURES_DIR = 'bench_fixtures'
+DEBUG_PAGES = {'indeed': ['indeed_page_source.html', 'indeed_full_page.html']}
+
+
+class OfflineElement:
+    """Just enough of a Selenium WebElement, backed by an lxml element"""
+
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def text(self):
+        return ' '.join(self.element.text_content().split())
+
+    def get_attribute(self, name):
+        return self.element.get(name)
+
+    def find_elements(self, by, value):
+        if by == By.CSS_SELECTOR:
+            matches = self.element.cssselect(value)
+        elif by == By.CLASS_NAME:
+            matches = self.element.cssselect('.' + value)
+        elif by == By.ID:
+            matches = self.element.cssselect('#' + value)
+        elif by == By.TAG_NAME:
+            matches = self.element.cssselect(value)
+        elif by == By.LINK_TEXT:
+            matches = [a for a in self.element.iter('a') if ' '.join(a.text_content().split()) == value]
+        else:
+            raise ValueError(f"Unsupported locator: {by}")
+        return [OfflineElement(match) for match in matches]
+
+    def find_element(self, by, value):
+        matches = self.find_elements(by, value)
+        if not matches:
+            raise NoSuchElementException(f"No element for {by}={value!r}")
+        return matches[0]
+
+
+class OfflineDriver(OfflineElement):
+    """A read-only stand-in for a WebDriver that has a saved page loaded"""
+
+    def __init__(self, html):
+        self.page_source = html
+        super().__init__(lxml.html.fromstring(html))
+
+
+def _indeed_cards(html):
+    from indeed_parser import parse_indeed
+    return [record._asdict() for record in parse_indeed(html)]
+
+
+def _indeed_heuristics(html):
+    from gpt_indeed import extract_jobs
+    return extract_jobs(html, verbose=False)
+
+
+def _rozee_cards(html):
+    from checker import jobs_from_cards
+    return [{'job_title': job['Title'], 'company_name': job['Company'], 'location': job['Location']}
+            for job in jobs_from_cards(parse_cards(html, 'rozee'))]
+
+
+def _linkedin_cards(html):
+    from scraping_linkedin import listing_record
+    return [record for record in map(listing_record, parse_cards(html, 'linkedin')) if record]
+
+
+def _rozee_elements(html):
+    """The old per-element WebDriver lookups, kept as a baseline for the bulk extractor"""
+    driver = OfflineDriver(html)
+    records = []
+    for card in driver.find_elements(By.CSS_SELECTOR, '.jobListing'):
+        record = {}
+        for field, selector in (('job_title', 'h3 a'), ('company_name', '.job-info span'),
+                                ('location', '.job-location')):
+            try:
+                record[field] = card.find_element(By.CSS_SELECTOR, selector).text.strip()
+            except NoSuchElementException:
+                record[field] = 'N/A'
+        records.append(record)
+    return records
+
+
+# Extractor name -> (site whose pages it parses, function from HTML to records)
+EXTRACTORS = {
+    'indeed-cards': ('indeed', _indeed_cards),
+    'indeed-heuristics': ('indeed', _indeed_heuristics),
+    'rozee-cards': ('rozee', _rozee_cards),
+    'rozee-elements': ('rozee', _rozee_elements),
+    'linkedin-cards': ('linkedin', _linkedin_cards),
+}
+
+
+def load_corpus(fixtures_dir=FIXTURES_DIR):
+    """Return {site: [(path, html, golden records or None)]}"""
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, '*', '*.html'))):
+        site = os.path.basename(os.path.dirname(path))
+        golden_path = path[:-len('.html')] + '.golden.json'
+        golden = None
+        if os.path.exists(golden_path):
+            with open(golden_path, encoding='utf-8') as f:
+                golden = json.load(f)
+        with open(path, encoding='utf-8') as f:
+            corpus.setdefault(site, []).append((path, f.read(), golden))
+
+    for site, names in DEBUG_PAGES.items():
+        for name in names:
+            if os.path.exists(name):
+                with open(name, encoding='utf-8') as f:
+                    corpus.setdefault(site, []).append((name, f.read(), None))
+    return corpus
+
+
+FIELDS = ('job_title', 'company_name', 'location')
+
+
+def _norm(value):
+    return ' '.join(str(value or '').lower().split())
+
+
+def recall(records, golden):
+    """Share of golden records found, comparing only the fields the golden record sets"""
+    if not golden:
+        return None
+    found = 0
+    for expected in golden:
+        fields = [field for field in FIELDS if field in expected]
+        if any(all(_norm(record.get(field)) == _norm(expected[field]) for field in fields)
+               for record in records):
+            found += 1
+    return found / len(golden)
+
+
+def run_extractor(extract, pages, repeat=5):
+    """Time extract over every page; return the metrics for one extractor"""
+    # Warm up imports and compiled selectors before timing
+    for _, html, _ in pages:
+        extract(html)
+
+    cards = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html, _ in pages:
+            cards += len(extract(html))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    scores = []
+    for _, html, golden in pages:
+        score = recall(extract(html), golden)
+        if score is not None:
+            scores.append(score)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    runs = repeat * len(pages)
+    return {
+        'pages': len(pages),
+        'pages_per_sec': runs / elapsed if elapsed else float('inf'),
+        'cards_per_sec': cards / elapsed if elapsed else float('inf'),
+        'peak_mib': peak / (1024 * 1024),
+        'recall': sum(scores) / len(scores) if scores else None,
+    }
+
+
+def run_benchmarks(fixtures_dir=FIXTURES_DIR, repeat=5, extractors=None):
+    corpus = load_corpus(fixtures_dir)
+    results = {}
+    for name, (site, extract) in EXTRACTORS.items():
+        if extractors and name not in extractors:
+            continue
+        pages = corpus.get(site)
+        if pages:
+            results[name] = run_extractor(extract, pages, repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the job card extractors on saved pages")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-recall', type=float, default=None,
+                        help="exit with status 1 if any extractor scores below this recall")
+    parser.add_argument('extractors', nargs='*', help="only run these extractors")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.fixtures, args.repeat, args.extractors)
+    print(f"{'extractor':<20}{'pages':>6}{'pages/s':>10}{'cards/s':>11}{'peak MiB':>10}{'recall':>8}")
+    failed = False
+    for name, r in results.items():
+        shown = f"{r['recall']:.2f}" if r['recall'] is not None else '-'
+        print(f"{name:<20}{r['pages']:>6}{r['pages_per_sec']:>10.1f}{r['cards_per_sec']:>11.1f}"
+              f"{r['peak_mib']:>10.2f}{shown:>8}")
+        if args.min_recall is not None and r['recall'] is not None and r['recall'] < args.min_recall:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import time
+from functools import lru_cache
+import lxml.html
+from lxml.cssselect import CSSSelector
+from instrument import span, observe
+
+# Where the job cards are on each site and which fields to read from them.
+# A field is a CSS selector (its text is read) or {'css': ..., 'attr': ...}.
+# Indeed pages are parsed from page_source by indeed_parser.py instead.
+SITE_CARDS = {
+    'rozee': {
+        'card': '.jobListing',
+        'fields': {
+            'title': 'h3 a',
+            'company': '.job-info span',
+            'location': '.job-location',
+            'date_posted': '.job-date',
+            'summary': '.job-desc',
+            'url': {'css': 'h3 a', 'attr': 'href'},
+        },
+    },
+    'linkedin': {
+        'card': '.jobs-search__results-list li',
+        # Clicked when scrolling stops loading more cards on its own
+        'more': 'button.infinite-scroller__show-more-button',
+        'fields': {
+            'title': '.base-search-card__title',
+            'company': '.base-search-card__subtitle',
+            'location': '.job-search-card__location',
+            'url': {'css': 'a.base-card__full-link', 'attr': 'href'},
+        },
+    },
+}
+
+# Reads one card's fields. Missing fields are null.
+_READ_CARD = """
+function readCard(card, fields) {
+    const record = {};
+    for (const [name, spec] of Object.entries(fields)) {
+        const el = card.querySelector(spec.css);
+        record[name] = !el ? null : spec.attr ? el.getAttribute(spec.attr) : el.innerText.trim();
+    }
+    return record;
+}
+"""
+
+# Reads every card (from index start on) in one round trip
+_EXTRACT_SCRIPT = _READ_CARD + """
+const [cardSelector, fields, start] = arguments;
+return Array.from(document.querySelectorAll(cardSelector)).slice(start).map(card => readCard(card, fields));
+"""
+
+# Queues the cards already on the page and, through a MutationObserver, every
+# card appended later, so each harvest step reads only cards it has not read yet
+_HARVEST_INSTALL = """
+const [cardSelector] = arguments;
+const old = window.__harvest;
+if (old && old.selector === cardSelector) { return old.queue.length; }
+if (old) { old.observer.disconnect(); }
+const state = {selector: cardSelector, queue: [], seen: new WeakSet()};
+const add = card => { if (!state.seen.has(card)) { state.seen.add(card); state.queue.push(card); } };
+document.querySelectorAll(cardSelector).forEach(add);
+state.observer = new MutationObserver(mutations => {
+    for (const m of mutations) {
+        for (const node of m.addedNodes) {
+            if (node.nodeType !== 1) { continue; }
+            if (node.matches(cardSelector)) { add(node); }
+            node.querySelectorAll(cardSelector).forEach(add);
+        }
+    }
+});
+state.observer.observe(document.body, {childList: true, subtree: true});
+window.__harvest = state;
+return state.queue.length;
+"""
+
+# One harvest step: when no new cards are queued, scroll to the bottom (and
+# click the "more" button if there is one), then wait up to timeoutMs for new
+# cards. Returns the fields of the queued cards and empties the queue.
+_HARVEST_STEP = _READ_CARD + """
+const [fields, moreSelector, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const state = window.__harvest;
+const drain = () => done(state.queue.splice(0).map(card => readCard(card, fields)));
+if (state.queue.length) { drain(); return; }
+window.scrollTo(0, document.body.scrollHeight);
+const more = moreSelector && document.querySelector(moreSelector);
+if (more && more.offsetParent !== null) { more.click(); }
+const started = Date.now();
+const poll = () => {
+    if (state.queue.length || Date.now() - started >= timeoutMs) { drain(); }
+    else { setTimeout(poll, 100); }
+};
+poll();
+"""
+
+# One entry per harvest: site, cards, seconds, steps and cards per second
+harvest_log = []
+
+
+def _field_specs(site):
+    fields = SITE_CARDS[site]['fields']
+    return {name: spec if isinstance(spec, dict) else {'css': spec, 'attr': None}
+            for name, spec in fields.items()}
+
+
+@lru_cache(maxsize=None)
+def _compiled(css):
+    return CSSSelector(css)
+
+
+def extract_cards(driver, site, start=0):
+    """Read all cards on the loaded page in a single execute_script call"""
+    with span('parse', site=site, format='dom') as fields:
+        cards = driver.execute_script(_EXTRACT_SCRIPT, SITE_CARDS[site]['card'], _field_specs(site), start)
+        fields['cards'] = len(cards or [])
+    observe('cards_per_page', fields['cards'], site=site)
+    return cards
+
+
+def harvest_cards(driver, site, target=None, step_timeout=3.0, idle_steps=2):
+    """Scroll an infinite-scroll results page, reading each card once as it is appended.
+
+    Stops at target cards, or once idle_steps scrolls in a row bring no new
+    cards. Returns the cards in page order.
+    """
+    config = SITE_CARDS[site]
+    start = time.perf_counter()
+    driver.set_script_timeout(step_timeout + 10)
+    driver.execute_script(_HARVEST_INSTALL, config['card'])
+
+    cards = []
+    steps = idle = 0
+    while target is None or len(cards) < target:
+        batch = driver.execute_async_script(
+            _HARVEST_STEP, _field_specs(site), config.get('more'), int(step_timeout * 1000))
+        steps += 1
+        if batch:
+            cards.extend(batch)
+            idle = 0
+        else:
+            idle += 1
+            if idle >= idle_steps:
+                break
+
+    seconds = time.perf_counter() - start
+    entry = {'site': site, 'cards': len(cards), 'seconds': seconds, 'steps': steps,
+             'cards_per_sec': len(cards) / seconds if seconds else 0.0}
+    harvest_log.append(entry)
+    observe('harvest_seconds', seconds, site=site)
+    observe('cards_per_page', len(cards), site=site)
+    print(f"Harvested {entry['cards']} {site} cards in {seconds:.1f}s over {steps} steps "
+          f"({entry['cards_per_sec']:.1f} cards/s)")
+    return cards[:target] if target else cards
+
+
+def parse_cards(html, site):
+    """Same as extract_cards, but parsed locally from saved page source"""
+    with span('parse', site=site, format='html') as fields:
+        root = lxml.html.fromstring(html)
+        specs = _field_specs(site)
+        records = []
+        for card in _compiled(SITE_CARDS[site]['card'])(root):
+            record = {}
+            for name, spec in specs.items():
+                found = _compiled(spec['css'])(card)
+                if not found:
+                    record[name] = None
+                elif spec['attr']:
+                    record[name] = found[0].get(spec['attr'])
+                else:
+                    record[name] = ' '.join(found[0].text_content().split())
+            records.append(record)
+        fields['cards'] = len(records)
+    observe('cards_per_page', len(records), site=site)
+    return records
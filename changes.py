@@ -0,0 +1,70 @@
+import os
+import json
+import time
+import data_loader
+
+# Append-only feed of store changes, one JSON event per line, inside the job store
+FEED_NAME = '_changes.jsonl'
+
+
+def feed_path(store_dir=data_loader.STORE_DIR):
+    return os.path.join(store_dir, FEED_NAME)
+
+
+def publish(store_dir, action, part_path, summary):
+    """Announce that a part was appended, imported (from a CSV) or retracted.
+
+    The event names the dashboard dimensions the part touches and carries
+    its postings per day, so a subscriber can update a timeline without
+    reading the part.
+    """
+    postings = summary[summary['dimension'] == 'postings'].dropna(subset=['scrapped_date'])
+    daily = postings.groupby('scrapped_date')['count'].sum()
+    event = {
+        'time': time.time(),
+        'action': action,
+        'part': os.path.basename(part_path),
+        'dimensions': sorted(set(summary['dimension'])),
+        'timeline': {str(day): int(count) for day, count in daily.items()},
+    }
+    # One small write per event, so concurrent writers do not interleave lines
+    with open(feed_path(store_dir), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(event) + '\n')
+    return event
+
+
+class Subscriber:
+    """Follow the change feed of a job store.
+
+    poll() returns the events published since the last poll (by default,
+    since the subscriber was created). It only stats the feed when
+    nothing changed, so it is cheap to call every few seconds.
+    """
+
+    def __init__(self, store_dir=data_loader.STORE_DIR, from_start=False):
+        self.path = feed_path(store_dir)
+        self.offset = 0
+        if not from_start and os.path.exists(self.path):
+            self.offset = os.path.getsize(self.path)
+
+    def poll(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # The feed was replaced; read it again from the start
+            self.offset = 0
+        if size == self.offset:
+            return []
+
+        events = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                # A line without its newline is still being written
+                if not line.endswith(b'\n'):
+                    break
+                self.offset += len(line)
+                events.append(json.loads(line))
+        return events
@@ -1,84 +1,204 @@
-import time
-from selenium import webdriver
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from skills import SkillMatcher
+from card_selectors import SITE_CARDS, extract_cards
+from seen_index import SeenIndex
+from output_sink import JobSink
+from driver_pool import DriverPool
+from scrape_profile import measure_page, page_summary
+from waits import wait_for_stable_count, wait_for_staleness, wait_summary
+from instrument import span, profile_page
+
+# Skills picked out of Rozee job summaries
+ROZEE_SKILLS = SkillMatcher(['Python', 'SQL', 'Excel', 'Communication', 'JavaScript'])
+
+SOURCE = "Rozee"
+BASE_URL = "https://www.rozee.pk/job/jsearch/q/"
+# Rozee paginates search results with an "fpn" offset in steps of this size
+PAGE_SIZE = 20
+CARD_SELECTOR = SITE_CARDS["rozee"]["card"]
+
+
+def search_url(query, location, page=0):
+    """Build the Rozee search URL for a query, location and zero-based page number"""
+    url = f"{BASE_URL}{query.replace(' ', '%20')}/l/{location.replace(' ', '%20')}"
+    if page:
+        url += f"/fpn/{page * PAGE_SIZE}"
+    return url
+
+
+def jobs_from_cards(cards):
+    """Turn raw card fields into job records"""
+    jobs = []
+    for card in cards:
+        summary = card["summary"]
+        jobs.append({
+            "Title": card["title"] if card["title"] is not None else "N/A",
+            "Company": card["company"] if card["company"] is not None else "N/A",
+            "Location": card["location"] if card["location"] is not None else "N/A",
+            "Date Posted": card["date_posted"] if card["date_posted"] is not None else "N/A",
+            "Skills": ", ".join(ROZEE_SKILLS.extract(summary)) if summary is not None else "N/A",
+            "url": card["url"],
+        })
+    return jobs
 
 
-def scrape_rozee_jobs(query="python", location="Pakistan", max_pages=3):
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
+def extract_jobs(driver):
+    """Extract the job cards on the page currently loaded in the driver"""
+    return jobs_from_cards(extract_cards(driver, "rozee"))
+
+
+def dedupe_jobs(jobs):
+    """Drop repeated postings, keeping the first occurrence"""
+    seen = set()
+    unique = []
+    for job in jobs:
+        key = (job["Title"], job["Company"], job["Location"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(job)
+    return unique
+
+
+def scrape_rozee_jobs(query="python", location="Pakistan", max_pages=3, seen=None, sink=None, pool=None):
+    """Scrape Rozee search results page by page.
+
+    With a SeenIndex, only postings not seen before are kept and paging
+    stops at the first page that holds nothing new. With a JobSink, each
+    page is written and checkpointed as soon as it is scraped (and the
+    returned list stays empty); a crawl resumes after its last checkpoint.
+    A DriverPool lets several crawls share warm browser sessions.
+    """
+    task = f"{query}|{location}"
+    start = sink.resume_page(task) if sink is not None else 0
+    if start is None:
+        print(f"{task} already finished, nothing to resume.")
+        return []
+
+    own_pool = pool is None
+    pool = pool or DriverPool(size=1, site="rozee")
+    jobs = []
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    try:
+        with pool.session() as driver:
+            jobs = _walk_pages(driver, pool, task, query, location, start, max_pages, seen, sink)
+    finally:
+        if own_pool:
+            pool.close()
+    return jobs
 
-    base_url = "https://www.rozee.pk/job/jsearch/q/"
-    search_url = f"{base_url}{query.replace(' ', '%20')}/l/{location.replace(' ', '%20')}"
-    driver.get(search_url)
-    time.sleep(3)
 
+def _walk_pages(driver, pool, task, query, location, start, max_pages, seen, sink):
+    """Follow the Next links from page start, saving or collecting each page's jobs"""
     jobs = []
+    with span("navigate", site="rozee"):
+        driver.get(search_url(query, location, start))
+    wait_for_stable_count(driver, CARD_SELECTOR, "rozee")
 
-    for page in range(max_pages):
+    for page in range(start, max_pages):
         print(f"Scraping page {page + 1}...")
 
-        job_cards = driver.find_elements(By.CSS_SELECTOR, ".jobListing")
-
-        for card in job_cards:
-            try:
-                title = card.find_element(By.CSS_SELECTOR, "h3 a").text.strip()
-            except:
-                title = "N/A"
-
-            try:
-                company = card.find_element(By.CSS_SELECTOR, ".job-info span").text.strip()
-            except:
-                company = "N/A"
-
-            try:
-                location = card.find_element(By.CSS_SELECTOR, ".job-location").text.strip()
-            except:
-                location = "N/A"
-
-            try:
-                date_posted = card.find_element(By.CSS_SELECTOR, ".job-date").text.strip()
-            except:
-                date_posted = "N/A"
-
-            try:
-                summary = card.find_element(By.CSS_SELECTOR, ".job-desc").text.strip()
-                skills = ", ".join([kw for kw in ['Python', 'SQL', 'Excel', 'Communication', 'JavaScript']
-                                    if kw.lower() in summary.lower()])
-            except:
-                skills = "N/A"
-
-            jobs.append({
-                "Title": title,
-                "Company": company,
-                "Location": location,
-                "Date Posted": date_posted,
-                "Skills": skills
-            })
-
-        # Try to go to the next page
-        try:
-            next_button = driver.find_element(By.LINK_TEXT, "Next")
-            next_button.click()
-            time.sleep(2)
-        except:
-            print("No more pages.")
+        with profile_page("page", site="rozee", query=query, page=page + 1) as fields:
+            measure_page(driver, "rozee")
+            page_jobs = extract_jobs(driver)
+            fields["cards"] = len(page_jobs)
+            pool.note_page(driver)
+            finished = False
+            if seen is not None:
+                new_jobs = seen.filter_new(page_jobs, SOURCE)
+                if page_jobs and not new_jobs:
+                    print("Every job on this page is already known, stopping.")
+                    finished = True
+                page_jobs = new_jobs
+
+            # Try to find the next page before saving, so the checkpoint knows if this was the last
+            next_button = None
+            if not finished and page + 1 < max_pages:
+                try:
+                    next_button = driver.find_element(By.LINK_TEXT, "Next")
+                except:
+                    print("No more pages.")
+            finished = finished or next_button is None
+
+            if sink is not None:
+                sink.write(page_jobs)
+                sink.checkpoint(task, page, finished=finished)
+                if seen is not None:
+                    seen.commit()
+            else:
+                jobs.extend(page_jobs)
+
+        if finished:
             break
+        with span("navigate", site="rozee"):
+            next_button.click()
+            wait_for_staleness(driver, next_button, "rozee")
+        wait_for_stable_count(driver, CARD_SELECTOR, "rozee")
+    return jobs
 
-    driver.quit()
+
+def scrape_rozee_parallel(queries, locations=("Pakistan",), max_pages=3, workers=None, seen=None, pool=None):
+    """Scrape every query x location x page combination on a pool of headless drivers.
+
+    Pages are fanned out to at most workers warm browser sessions.
+    A failing page is reported and skipped without affecting the others.
+    Returns one deduplicated list of jobs, limited to unseen postings when a
+    SeenIndex is given.
+    """
+    workers = workers or os.cpu_count() or 1
+    own_pool = pool is None
+    pool = pool or DriverPool(size=workers, site="rozee")
+
+    def scrape_page(query, location, page):
+        with pool.session() as driver, profile_page("page", site="rozee", query=query, page=page + 1):
+            with span("navigate", site="rozee"):
+                driver.get(search_url(query, location, page))
+            wait_for_stable_count(driver, CARD_SELECTOR, "rozee")
+            measure_page(driver, "rozee")
+            pool.note_page(driver)
+            return extract_jobs(driver)
+
+    tasks = [(q, l, p) for q in queries for l in locations for p in range(max_pages)]
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks) or 1)) as executor:
+            futures = {executor.submit(scrape_page, *task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                query, location, page = task
+                try:
+                    results[task] = future.result()
+                    print(f"Scraped {query!r} in {location} page {page + 1}: {len(results[task])} jobs")
+                except Exception as e:
+                    print(f"Failed {query!r} in {location} page {page + 1}: {e}")
+    finally:
+        if own_pool:
+            pool.close()
+
+    # Merge in task order so the output does not depend on completion order
+    jobs = []
+    for task in tasks:
+        jobs.extend(results.get(task, []))
+    jobs = dedupe_jobs(jobs)
+    if seen is not None:
+        jobs = seen.filter_new(jobs, SOURCE)
     return jobs
 
 
 # Run the scraper
 if __name__ == "__main__":
-    results = scrape_rozee_jobs("python", "Pakistan", max_pages=3)
-    for i, job in enumerate(results, 1):
-        print(f"\nJob {i}")
-        for k, v in job.items():
-            print(f"{k}: {v}")
+    # Pass --resume to continue an interrupted crawl from its last checkpoint
+    with SeenIndex() as seen, JobSink("rozee_jobs.jsonl", SOURCE, resume="--resume" in sys.argv) as sink, \
+            DriverPool(size=1, site="rozee") as pool:
+        scrape_rozee_jobs("python", "Pakistan", max_pages=3, seen=seen, sink=sink, pool=pool)
+    print(f"{sink.written} jobs written to {sink.path}")
+    pool.report()
+    pages = page_summary("rozee")
+    if pages['pages']:
+        print(f"{pages['pages']} pages, {pages['bytes'] / 1024:.0f} KiB transferred, "
+              f"{pages['mean_load_ms']:.0f} ms mean load time")
+
+    for (site, condition), stats in wait_summary().items():
+        print(f"Waited {stats['total']:.2f}s in total for {condition} on {site} ({stats['count']} waits)")
@@ -0,0 +1,175 @@
+import os
+import hashlib
+import pandas as pd
+
+# Files the dashboard reads, mapped to the source label they get
+DEFAULT_SOURCES = {
+    'cleaned_linkedin_jobs.csv': 'LinkedIn',
+    'cleaned_indeed_jobs.csv': 'Indeed',
+}
+
+# Directory of the columnar job store (see job_store.py)
+STORE_DIR = 'job_store'
+
+# Low-cardinality text columns, held as categoricals (one copy of each distinct value)
+CATEGORY_COLUMNS = ['job_title', 'company_name', 'location', 'source']
+# Free text columns, held as nullable strings
+TEXT_COLUMNS = ['skills']
+
+# Memoized (fingerprint, frame) pairs per set of inputs
+_frame_cache = {}
+# Last seen (mtime, size) per path so unchanged files are not re-hashed
+_hash_cache = {}
+
+
+def clean_and_standardize(df, source):
+    # Standardize column names
+    rename_map = {
+        'title': 'job_title',
+        'company': 'company_name',
+        'date posted': 'scrapped_date',
+        'date_posted': 'scrapped_date'
+    }
+    df = df.rename(columns=rename_map)
+    # Ensure all columns exist
+    for col in ['job_title', 'company_name', 'location', 'skills', 'scrapped_date']:
+        if col not in df.columns:
+            df[col] = None
+    # Standardize date format (day precision, NaT when missing)
+    df['scrapped_date'] = pd.to_datetime(df['scrapped_date'], errors='coerce').dt.normalize()
+    # Empty strings count as missing
+    df = df.replace('', pd.NA)
+    # Add source column
+    df['source'] = source
+    return compact(df)
+
+
+def compact(df):
+    """Convert the standard columns to categorical / nullable string dtypes"""
+    dtypes = {col: 'category' for col in CATEGORY_COLUMNS if col in df.columns}
+    dtypes.update({col: 'string' for col in TEXT_COLUMNS if col in df.columns})
+    return df.astype(dtypes)
+
+
+def memory_report(df):
+    """Bytes held by each column (strings included), largest first, with a total row"""
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': usage,
+        'distinct': df.nunique(dropna=True),
+    }).sort_values('bytes', ascending=False)
+    report.loc['total'] = ['', usage.sum(), pd.NA]
+    report['MB'] = (report['bytes'] / 2**20).round(2)
+    return report
+
+
+def file_fingerprint(path):
+    """Return (mtime, size, sha1) for a file, hashing only when the stat changed"""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _hash_cache.get(path)
+    if cached and cached[0] == key:
+        return key + (cached[1],)
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    _hash_cache[path] = (key, digest.hexdigest())
+    return key + (digest.hexdigest(),)
+
+
+def _build_frame(sources):
+    """Read, standardize and combine the source files (no write-back)"""
+    frames = []
+    for path, source in sources.items():
+        frames.append(clean_and_standardize(pd.read_csv(path), source))
+
+    # Each file has its own categories, so the concatenation is compacted again
+    return compact(pd.concat(frames, ignore_index=True))
+
+
+def load_jobs(sources=None, columns=None):
+    """Return the combined, standardized frame, rebuilt only when an input changes.
+
+    Reads from the columnar job store when it has data and no explicit sources are
+    given (the CSV history is imported into it once), otherwise from the CSV files. The returned frame is shared between calls,
+    so callers must not modify it in place.
+    """
+    if sources is None and _use_store():
+        import job_store
+        slot = ('store', tuple(columns or ()))
+        return _memoize(slot, job_store.store_fingerprint(), lambda: job_store.read_jobs(columns))
+
+    sources = sources or DEFAULT_SOURCES
+    fingerprint = tuple(file_fingerprint(path) for path in sources)
+    return _memoize(tuple(sources.items()), fingerprint, lambda: _build_frame(sources))
+
+
+def load_summary(sources=None):
+    """Return the dashboard counts (see aggregates.py), memoized like load_jobs.
+
+    With the job store these are read from the summaries materialized at
+    ingest time, so no raw rows are loaded.
+    """
+    import aggregates
+    if sources is None and _use_store():
+        import job_store
+        return _memoize(('summary', 'store'), job_store.store_fingerprint(),
+                        lambda: aggregates.load_summaries(STORE_DIR))
+
+    sources = sources or DEFAULT_SOURCES
+    fingerprint = tuple(file_fingerprint(path) for path in sources)
+    return _memoize(('summary',) + tuple(sources.items()), fingerprint,
+                    lambda: aggregates.summarize(load_jobs(sources)))
+
+
+def load_clusters(sources=None):
+    """Near-duplicate cluster ids (see dedupe.py) aligned with load_jobs(sources), memoized like it"""
+    import dedupe
+    if sources is None and _use_store():
+        import job_store
+        return _memoize(('clusters', 'store'), job_store.store_fingerprint(),
+                        lambda: dedupe.cluster_ids(load_jobs(columns=['job_title', 'company_name'])))
+
+    sources = sources or DEFAULT_SOURCES
+    fingerprint = tuple(file_fingerprint(path) for path in sources)
+    return _memoize(('clusters',) + tuple(sources.items()), fingerprint,
+                    lambda: dedupe.cluster_ids(load_jobs(sources)))
+
+
+def _use_store():
+    """True when the job store has data (writers seed it with the CSV history first)"""
+    if not os.path.isdir(STORE_DIR):
+        return False
+    import job_store
+    return job_store.has_data()
+
+
+def _memoize(slot, fingerprint, build):
+    """Return the frame cached in slot, rebuilding it when the fingerprint moved on"""
+    cached = _frame_cache.get(slot)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+    df = build()
+    _frame_cache[slot] = (fingerprint, df)
+    return df
+
+
+def evict(sources=None):
+    """Drop memoized frames; all of them, or only those built from the given sources"""
+    if sources is None:
+        _frame_cache.clear()
+        _hash_cache.clear()
+        return
+
+    paths = set(sources)
+    for slot in list(_frame_cache):
+        if {entry[0] for entry in slot if isinstance(entry, tuple)} & paths:
+            del _frame_cache[slot]
+
+
+if __name__ == "__main__":
+    # Print how much memory the dashboard frame takes, per column
+    print(memory_report(load_jobs()))
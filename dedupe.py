@@ -0,0 +1,220 @@
+import re
+import zlib
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Spelling variants folded together before comparing titles
+TITLE_PHRASES = {
+    r'\bfront[\s-]*end\b': 'frontend',
+    r'\bback[\s-]*end\b': 'backend',
+    r'\bfull[\s-]*stack\b': 'fullstack',
+    r'\bdev[\s-]*ops\b': 'devops',
+    r'\bmachine learning\b': 'ml',
+}
+TITLE_WORDS = {
+    'engineer': 'developer', 'engineers': 'developer', 'dev': 'developer', 'developers': 'developer',
+    'programmer': 'developer', 'swe': 'software developer',
+    'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'jnr': 'junior',
+    'mgr': 'manager', 'eng': 'engineering',
+}
+# Words that set a role's level apart: titles differing in them are different roles
+TITLE_LEVELS = {'i', 'ii', 'iii', 'iv', 'v', '1', '2', '3', '4', '5',
+                'intern', 'junior', 'senior', 'lead', 'staff', 'principal'}
+# Legal-form suffixes dropped from company names
+COMPANY_SUFFIXES = {'inc', 'incorporated', 'llc', 'ltd', 'limited', 'pvt', 'private', 'corp',
+                    'corporation', 'co', 'company', 'plc', 'gmbh', 'sa', 'ag', 'group'}
+
+# MinHash signatures of NUM_PERM values split into BANDS bands: two titles of
+# the same company become candidates when a whole band matches, which
+# happens often above a Jaccard similarity of about (1 / BANDS) ** (1 / rows)
+NUM_PERM = 64
+BANDS = 16
+# Candidates are the same posting when their shingle sets are at least this similar
+THRESHOLD = 0.7
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _PRIME, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, NUM_PERM).astype(np.uint64)
+_PHRASES = [(re.compile(pattern), repl) for pattern, repl in TITLE_PHRASES.items()]
+
+
+def _title_words(text):
+    text = text.lower()
+    for pattern, repl in _PHRASES:
+        text = pattern.sub(repl, text)
+    words = []
+    for word in re.findall(r'[a-z0-9+#]+', text):
+        words.extend(TITLE_WORDS.get(word, word).split())
+    return words
+
+
+@lru_cache(maxsize=65536)
+def canonical_title(title):
+    """Lowercase title with spelling variants and abbreviations folded, words sorted"""
+    return ' '.join(sorted(set(_title_words(str(title)))))
+
+
+@lru_cache(maxsize=65536)
+def title_variants(title):
+    """Canonical forms a title stands for: itself, and each alternative of a slash-combined title.
+
+    Each alternative is taken both as written and with the words around
+    the slashes shared, so "Front-End / Full-Stack Developer" also stands
+    for "Frontend Developer" and "Fullstack Developer", and "Sr. Python/Django
+    Developer" for "Senior Python Developer" and "Senior Django Developer".
+    """
+    variants = [canonical_title(title)]
+    parts = [_title_words(part) for part in str(title).split('/')]
+    parts = [words for words in parts if words]
+    if len(parts) > 1:
+        # Words before the first alternative's last word and after the last one's first word
+        prefix, suffix = parts[0][:-1], parts[-1][1:]
+        cores = [parts[0][-1:]] + parts[1:-1] + [parts[-1][:1]]
+        for words in parts + [prefix + core + suffix for core in cores]:
+            variants.append(' '.join(sorted(set(words))))
+    return tuple(dict.fromkeys(variant for variant in variants if variant))
+
+
+@lru_cache(maxsize=65536)
+def canonical_company(name):
+    """Lowercase company name without punctuation or legal-form suffixes"""
+    text = re.sub(r'\(.*?\)', ' ', str(name).lower())
+    words = [w for w in re.findall(r'[a-z0-9&]+', text) if w not in COMPANY_SUFFIXES]
+    return ' '.join(words)
+
+
+@lru_cache(maxsize=65536)
+def shingles(canonical):
+    """Words plus character trigrams of each word, so typos still overlap"""
+    found = set()
+    for word in canonical.split():
+        found.add(word)
+        padded = f' {word} '
+        found.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(found)
+
+
+def minhash(shingle_set):
+    """MinHash signature of a set of strings"""
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingle_set), dtype=np.uint64)
+    if not len(hashes):
+        return np.zeros(NUM_PERM, dtype=np.uint64)
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+@lru_cache(maxsize=65536)
+def band_keys(canonical):
+    """LSH bucket keys of a canonical title, one per band (titles repeat across companies)"""
+    signature = minhash(shingles(canonical))
+    rows = NUM_PERM // BANDS
+    return tuple(signature[band * rows:(band + 1) * rows].tobytes() for band in range(BANDS))
+
+
+@lru_cache(maxsize=65536)
+def variant_band_keys(variants):
+    """(band, key) pairs of all variants of a title, without repeats"""
+    return tuple({(band, key) for variant in variants for band, key in enumerate(band_keys(variant))})
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _similarity(x, y):
+    """Jaccard similarity of two canonical titles' shingles; 0 when their levels differ"""
+    if TITLE_LEVELS.intersection(x.split()) != TITLE_LEVELS.intersection(y.split()):
+        return 0.0
+    return _jaccard(shingles(x), shingles(y))
+
+
+@lru_cache(maxsize=65536)
+def title_similarity(a, b):
+    """Best similarity between any variants of two titles (tuples from title_variants)"""
+    return max(_similarity(x, y) for x in a for y in b)
+
+
+def cluster_ids(df, threshold=THRESHOLD):
+    """Cluster id per row; rows sharing an id are the same posting.
+
+    Companies must match after canonicalization and titles are compared
+    by MinHash/LSH within each company, so only rows that share a band
+    are ever compared. Titles are first clustered as written. A
+    slash-combined title (see title_variants) that matched no other
+    combined title then joins the cluster of its best-matching
+    alternative, so it never chains its alternatives together. Each
+    distinct (title, company) pair is processed once. The id is the
+    position of the cluster's first row.
+    """
+    titles = df['job_title'].astype(object).where(df['job_title'].notna(), '')
+    companies = df['company_name'].astype(object).where(df['company_name'].notna(), '')
+    pairs = pd.Series(list(zip(titles.map(title_variants), companies.map(canonical_company))), index=df.index)
+
+    uniques = pd.unique(pairs)
+    parent = list(range(len(uniques)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    by_company = {}
+    for i, (variants, company) in enumerate(uniques):
+        # Without a title or company there is nothing to match on
+        if variants and company:
+            by_company.setdefault(company, []).append(i)
+
+    for titles_of_company in by_company.values():
+        if len(titles_of_company) < 2:
+            continue
+        combined = {i for i in titles_of_company if len(uniques[i][0]) > 1}
+
+        # Titles as written; a combined title only matches other combined titles here
+        buckets = {}
+        for i in titles_of_company:
+            for band, key in enumerate(band_keys(uniques[i][0][0])):
+                buckets.setdefault((band, key), []).append(i)
+        for members in buckets.values():
+            for k, a in enumerate(members):
+                for b in members[k + 1:]:
+                    if (a in combined) != (b in combined) or find(a) == find(b):
+                        continue
+                    # Titles repeat across companies, so their similarity is cached
+                    if title_similarity(uniques[a][0][:1], uniques[b][0][:1]) >= threshold:
+                        union(a, b)
+
+        # Each group of combined titles joins the single cluster its alternatives match best
+        groups = {}
+        for i in combined:
+            groups.setdefault(find(i), []).append(i)
+        for group in groups.values():
+            candidates = set()
+            for i in group:
+                for key in variant_band_keys(uniques[i][0][1:]):
+                    candidates.update(j for j in buckets.get(key, ()) if j not in combined)
+            scores = [(max(title_similarity(uniques[i][0][1:], uniques[j][0][:1]) for i in group), -j)
+                      for j in sorted(candidates)]
+            if scores and max(scores)[0] >= threshold:
+                union(group[0], -max(scores)[1])
+
+    position = {pair: find(i) for i, pair in enumerate(uniques)}
+    first_row = {}
+    ids = []
+    for row, pair in enumerate(pairs):
+        root = position[pair]
+        ids.append(first_row.setdefault(root, row))
+    return pd.Series(ids, index=df.index, name='cluster_id')
+
+def top_titles(df, clusters, n=5):
+    """Most frequent titles counting each cluster once, like aggregates.top_values(..., 'title')"""
+    frame = pd.DataFrame({'title': df['job_title'].astype(object), 'cluster': clusters}).dropna()
+    # Each cluster is labelled with its most common title
+    labels = frame.groupby('cluster')['title'].agg(lambda titles: titles.value_counts().index[0])
+    counts = labels.value_counts().rename('count').rename_axis('title')
+    return counts.head(n) if n else counts
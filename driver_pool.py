@@ -0,0 +1,190 @@
+import time
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from scrape_profile import apply_scrape_profile
+from instrument import span
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+# Origins of the loaded page and of every resource it loaded (third-party frames included)
+_ORIGINS_SCRIPT = """
+var origins = [location.origin];
+performance.getEntriesByType('resource').forEach(function (entry) {
+  try { origins.push(new URL(entry.name).origin); } catch (e) {}
+});
+return origins;
+"""
+
+
+def driver_path():
+    """Resolve the chromedriver binary once per process"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+
+def headless_options():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    return options
+
+
+class DriverPool:
+    """Keep up to size warm Chrome sessions and lend them out one job at a time.
+
+    Sessions are reset (cookies, storage, blank page) between jobs and
+    recycled after max_pages pages (jobs report them with note_page) or
+    once their JS heap grows past max_heap_mb. Startup, reuse, reset and
+    recycle timings are kept in stats so the share of a crawl spent
+    booting browsers is visible. With a site name, every session uses that
+    site's lightweight scrape profile (see scrape_profile.py).
+    """
+
+    def __init__(self, size=2, options_factory=headless_options, max_pages=50, max_heap_mb=512, site=None):
+        self.options_factory = options_factory
+        self.site = site
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'startups': 0, 'startup_seconds': 0.0,
+            'reuses': 0,
+            'resets': 0, 'reset_seconds': 0.0,
+            'recycles': 0, 'recycle_seconds': 0.0,
+            'busy_seconds': 0.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start(self):
+        start = time.perf_counter()
+        with span('driver_startup', site=self.site or 'default'):
+            path = driver_path()
+            driver = webdriver.Chrome(service=Service(path), options=self.options_factory())
+            if self.site:
+                apply_scrape_profile(driver, self.site)
+        with self._lock:
+            self.stats['startups'] += 1
+            self.stats['startup_seconds'] += time.perf_counter() - start
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _quit(self, driver, recycle=True):
+        start = time.perf_counter()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            if recycle:
+                self.stats['recycles'] += 1
+                self.stats['recycle_seconds'] += time.perf_counter() - start
+            self._pages.pop(id(driver), None)
+
+    def _reset(self, driver):
+        """Clear cookies and storage so the next job starts clean.
+
+        WebDriver only reaches the current origin, so this goes through CDP:
+        cookies are cleared for every domain, and storage for every origin
+        the last page or its resources came from.
+        """
+        start = time.perf_counter()
+        origins = set(driver.execute_script(_ORIGINS_SCRIPT) or []) - {'null'}
+        driver.execute_script("try { sessionStorage.clear(); } catch (e) {}")
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in origins:
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        driver.get("about:blank")
+        with self._lock:
+            self.stats['resets'] += 1
+            self.stats['reset_seconds'] += time.perf_counter() - start
+
+    def _worn_out(self, driver):
+        if self._pages.get(id(driver), 0) >= self.max_pages:
+            return True
+        try:
+            heap = driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0")
+        except Exception:
+            return True
+        return heap > self.max_heap_mb * 1024 * 1024
+
+    def note_page(self, driver, count=1):
+        """Count pages loaded by a job, for recycling after max_pages"""
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + count
+
+    @contextmanager
+    def session(self):
+        """Borrow a warm driver for one job; it is reset or recycled when the job ends"""
+        self._slots.acquire()
+        driver = None
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+                if driver is not None:
+                    self.stats['reuses'] += 1
+            if driver is None:
+                driver = self._start()
+
+            start = time.perf_counter()
+            failed = False
+            try:
+                yield driver
+            except Exception:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self.stats['busy_seconds'] += time.perf_counter() - start
+
+                # A job that failed may have left the browser in a bad state
+                keep = not failed and not self._worn_out(driver)
+                if keep:
+                    try:
+                        self._reset(driver)
+                    except Exception:
+                        keep = False
+                if keep:
+                    with self._lock:
+                        self._idle.append(driver)
+                else:
+                    self._quit(driver)
+        finally:
+            self._slots.release()
+
+    def boot_share(self):
+        """Fraction of driver time spent starting, resetting and recycling browsers"""
+        s = self.stats
+        overhead = s['startup_seconds'] + s['reset_seconds'] + s['recycle_seconds']
+        total = overhead + s['busy_seconds']
+        return overhead / total if total else 0.0
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver, recycle=False)
+
+    def report(self):
+        s = self.stats
+        print(f"Driver pool: {s['startups']} startups ({s['startup_seconds']:.1f}s), "
+              f"{s['reuses']} reuses, {s['resets']} resets ({s['reset_seconds']:.1f}s), "
+              f"{s['recycles']} recycles ({s['recycle_seconds']:.1f}s), "
+              f"{self.boot_share():.0%} of driver time spent on browser lifecycle")
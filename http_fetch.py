@@ -0,0 +1,111 @@
+import asyncio
+import codecs
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+import aiohttp
+import lxml.html
+from lxml import etree
+
+try:
+    import brotli  # noqa: F401  (lets aiohttp decode "br" bodies)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Browser-like headers for sites that can be fetched without Selenium
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+CHUNK_SIZE = 64 * 1024
+
+# tree is the parsed page when fetch(..., tree=True) was asked for it (None when the body did not parse)
+FetchResult = namedtuple("FetchResult", ["url", "status", "text", "error", "elapsed", "tree"], defaults=[None])
+
+
+class AsyncFetcher:
+    """Fetch pages concurrently over one pooled aiohttp session.
+
+    Use as an async context manager. Requests are capped at max_connections in
+    total and per_host per host; host_limits overrides the cap for single hosts.
+    """
+
+    def __init__(self, headers=None, max_connections=50, per_host=8, host_limits=None, timeout=20):
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        # Only advertise encodings we can actually decode
+        self.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.host_limits = host_limits or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._semaphores = {}
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).hostname
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, self.per_host))
+        return self._semaphores[host]
+
+    async def stream(self, url, feed):
+        """Fetch url and pass the decoded body to feed(text) chunk by chunk; return the status"""
+        async with self._host_semaphore(url):
+            async with self.session.get(url) as response:
+                try:
+                    decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+                except LookupError:
+                    # A charset Python does not know; most such pages are utf-8 anyway
+                    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    feed(decoder.decode(chunk))
+                feed(decoder.decode(b"", final=True))
+                return response.status
+
+    async def fetch(self, url, tree=False):
+        """Fetch url and return a FetchResult; errors are captured, not raised.
+
+        With tree=True the body is also fed to an incremental lxml parser as
+        it arrives, so the page is parsed by the time the download ends.
+        """
+        start = time.perf_counter()
+        parts = []
+        parser = lxml.html.HTMLParser() if tree else None
+
+        def feed(text):
+            parts.append(text)
+            if parser is not None and text:
+                parser.feed(text)
+
+        try:
+            status = await self.stream(url, feed)
+        except (aiohttp.ClientError, asyncio.TimeoutError, LookupError, UnicodeDecodeError) as e:
+            return FetchResult(url, None, None, e, time.perf_counter() - start)
+        root = None
+        if parser is not None:
+            try:
+                root = parser.close()
+            except etree.LxmlError:
+                pass
+        return FetchResult(url, status, "".join(parts), None, time.perf_counter() - start, root)
+
+    async def fetch_all(self, urls, tree=False):
+        return await asyncio.gather(*(self.fetch(url, tree) for url in urls))
+
+
+def fetch_all(urls, tree=False, **options):
+    """Fetch a list of URLs concurrently from synchronous code; results keep the input order"""
+    async def run():
+        async with AsyncFetcher(**options) as fetcher:
+            return await fetcher.fetch_all(urls, tree)
+    return asyncio.run(run())
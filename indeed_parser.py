@@ -0,0 +1,114 @@
+from collections import namedtuple
+import lxml.html
+from lxml import etree
+from instrument import span, observe
+
+JobRecord = namedtuple("JobRecord", ["job_title", "company_name", "location", "details", "url"])
+
+
+def _has_class(name):
+    """XPath predicate matching elements whose class list contains name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Card roots, tried in order like the old BeautifulSoup selectors
+CARD_TIERS = [
+    etree.XPath("//div[@id='mosaic-provider-jobcards']//li"),
+    etree.XPath(f"//*[{_has_class('job_seen_beacon')} or {_has_class('jobCard')} or {_has_class('job-card')}]"),
+]
+# Last resort: anything that looks like a job title link
+TITLE_ANCHORS = etree.XPath("//h2 | //a[contains(@href, '/rc/clk')]")
+
+# Field selectors, evaluated relative to a card; the first non-empty match wins
+TITLES = [
+    etree.XPath(f".//h2[{_has_class('jobTitle')}]"),
+    etree.XPath(f".//a[{_has_class('jcs-JobTitle')}]"),
+    etree.XPath(".//h2//span"),
+    etree.XPath(".//a"),
+]
+COMPANY = etree.XPath(f".//span[@data-testid='company-name'] | .//span[{_has_class('companyName')}]")
+LOCATION = etree.XPath(f".//div[@data-testid='text-location'] | .//div[{_has_class('companyLocation')}]")
+DETAILS = etree.XPath(f".//div[{_has_class('job-snippet')} or {_has_class('jobMetaDataGroup')} or {_has_class('summary')}]")
+LINK_HREF = etree.XPath("(.//a[@href])[1]/@href")
+
+
+def _outermost(elements):
+    """Drop elements nested inside another element of the list, keeping document order"""
+    chosen = set(elements)
+    return [el for el in elements if not any(parent in chosen for parent in el.iterancestors())]
+
+
+def _card_per_anchor(anchors):
+    """Grow each title anchor to the largest ancestor that holds no other anchor"""
+    counts = {}
+    for anchor in anchors:
+        for el in anchor.iterancestors():
+            counts[el] = counts.get(el, 0) + 1
+
+    cards = []
+    for anchor in anchors:
+        card = anchor
+        for el in anchor.iterancestors():
+            if counts[el] > 1:
+                break
+            card = el
+        cards.append(card)
+    return list(dict.fromkeys(cards))
+
+
+def find_cards(root):
+    """Return the job card elements of a parsed page, without overlaps"""
+    for tier in CARD_TIERS:
+        cards = tier(root)
+        if cards:
+            return _outermost(cards)
+    return _card_per_anchor(_outermost(TITLE_ANCHORS(root)))
+
+
+def _first_text(card, *selectors):
+    for selector in selectors:
+        for el in selector(card):
+            text = el.text_content().strip()
+            if text:
+                return text
+    return None
+
+
+def parse_card(card):
+    """Build a JobRecord from one card element, or None when it has no title or company"""
+    title = _first_text(card, *TITLES)
+    company = _first_text(card, COMPANY)
+    if not (title or company):
+        return None
+    href = LINK_HREF(card)
+    return JobRecord(
+        job_title=title,
+        company_name=company,
+        location=_first_text(card, LOCATION),
+        details=_first_text(card, DETAILS),
+        url=href[0] if href else None,
+    )
+
+
+def parse_indeed(html):
+    """Parse an Indeed listing page into a list of JobRecords"""
+    if not html or not html.strip():
+        return []
+    return _parse_root(lambda: lxml.html.fromstring(html), 'html')
+
+
+def parse_indeed_tree(root):
+    """Same as parse_indeed, for a page lxml already parsed (e.g. while it was downloaded)"""
+    return _parse_root(lambda: root, 'tree')
+
+
+def _parse_root(load, fmt):
+    with span('parse', site='indeed', format=fmt) as fields:
+        records = []
+        for card in find_cards(load()):
+            record = parse_card(card)
+            if record:
+                records.append(record)
+        fields['cards'] = len(records)
+    observe('cards_per_page', len(records), site='indeed')
+    return records
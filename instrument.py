@@ -0,0 +1,272 @@
+import os
+import io
+import json
+import time
+import uuid
+import heapq
+import atexit
+import pstats
+import cProfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+
+# Where finished spans (one JSON object per line) and metrics are written
+TRACE_PATH = os.environ.get('JOB_TRACE_PATH', 'traces.jsonl')
+METRICS_PATH = os.environ.get('JOB_METRICS_PATH', 'metrics.prom')
+# Keep cProfile stats for this many of the slowest pages (0 turns profiling off)
+PROFILE_SLOWEST = int(os.environ.get('JOB_PROFILE_SLOWEST', 0))
+PROFILE_DIR = 'profiles'
+# Long-running processes (dashboard, scheduler) write traces and metrics this often (seconds)
+FLUSH_INTERVAL = 10
+
+# Histogram buckets by the unit a metric name ends in; other metrics are counts (e.g. cards_per_page)
+BUCKETS = {
+    '_seconds': (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    '_bytes': tuple(1024 * 4 ** i for i in range(9)),
+}
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_lock = threading.Lock()
+# Held while the files are written, so explicit and periodic flushes do not overlap
+_write_lock = threading.Lock()
+# Held while a page is being profiled; only one profiler can be active at a time
+_profiling = threading.Lock()
+_local = threading.local()
+_trace_id = uuid.uuid4().hex[:16]
+# Finished spans not yet written to TRACE_PATH
+_pending = []
+# (metric name, sorted label items) -> [count, sum, max, bucket counts]
+_metrics = {}
+# Heap of (seconds, sequence, name, labels, stats text) for the slowest profiled pages
+_profiles = []
+_last_flush = time.monotonic()
+
+
+def buckets(name):
+    """Upper bounds of a metric's histogram buckets"""
+    for unit, bounds in BUCKETS.items():
+        if name.endswith(unit):
+            return bounds
+    return COUNT_BUCKETS
+
+
+def observe(name, value, **labels):
+    """Add a value (a duration in seconds, a size in bytes, a card count, ...) to a metric's histogram"""
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    bounds = buckets(name)
+    with _lock:
+        entry = _metrics.get(key)
+        if entry is None:
+            entry = _metrics[key] = [0, 0.0, 0.0, [0] * len(bounds)]
+        entry[0] += 1
+        entry[1] += value
+        entry[2] = max(entry[2], value)
+        for i, bound in enumerate(bounds):
+            if value <= bound:
+                entry[3][i] += 1
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block as a trace span; its duration also goes to the <name>_seconds metric.
+
+    Spans opened inside the block (on the same thread) record this one as
+    their parent. Attributes set on the yielded dict (e.g. a card count)
+    are saved with the span.
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    record = {'trace': _trace_id, 'span': uuid.uuid4().hex[:16],
+              'parent': stack[-1]['span'] if stack else None, 'name': name, 'start': time.time()}
+    stack.append(record)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        record.update(seconds=seconds, attrs=attrs, error=error)
+        labels = {k: v for k, v in attrs.items() if k in ('site', 'section', 'stage', 'condition', 'format')}
+        observe(f"{name}_seconds", seconds, **labels)
+        if _claim_flush(record):
+            _safe_flush()
+
+
+@contextmanager
+def profile_page(name, **attrs):
+    """A span that, with JOB_PROFILE_SLOWEST set, also profiles the block and keeps the slowest ones.
+
+    Pages that start while another page is being profiled (parallel
+    crawls) are timed but not profiled.
+    """
+    if not PROFILE_SLOWEST or not _profiling.acquire(blocking=False):
+        with span(name, **attrs) as fields:
+            yield fields
+        return
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        with span(name, **attrs) as fields:
+            profiler.enable()
+            try:
+                yield fields
+            finally:
+                profiler.disable()
+    finally:
+        _profiling.release()
+    seconds = time.perf_counter() - start
+    with _lock:
+        if len(_profiles) < PROFILE_SLOWEST or seconds > _profiles[0][0]:
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(30)
+            item = (seconds, next(_sequence), name, dict(fields), text.getvalue())
+            if len(_profiles) < PROFILE_SLOWEST:
+                heapq.heappush(_profiles, item)
+            else:
+                heapq.heapreplace(_profiles, item)
+
+
+_sequence = iter(range(1 << 62))
+
+
+def _is_main_process():
+    # Parser worker processes keep their own registry; only the parent writes the files
+    return multiprocessing.parent_process() is None
+
+
+def _claim_flush(record):
+    """Queue a finished span; True when this thread should flush (only one thread per interval is told so)"""
+    global _last_flush
+    if not _is_main_process():
+        # Workers never flush, so their spans would only pile up; they report through the parent's metrics
+        return False
+    now = time.monotonic()
+    with _lock:
+        _pending.append(record)
+        if len(_pending) < 1000 and now - _last_flush < FLUSH_INTERVAL:
+            return False
+        _last_flush = now
+        return True
+
+
+def _safe_flush():
+    """flush(), reporting instead of raising, so instrumentation never fails the work it measures"""
+    try:
+        flush()
+    except Exception as e:
+        print(f"Could not write traces or metrics: {e}")
+
+
+def write_traces(path=TRACE_PATH):
+    """Append the finished spans to the trace file"""
+    with _lock:
+        records, _pending[:] = list(_pending), []
+    if not records:
+        return
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + '\n')
+
+
+def _labels(items, extra=()):
+    items = list(items) + list(extra)
+    if not items:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ') for _, v in items)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + '}'
+
+
+def prometheus_text():
+    """The metrics in Prometheus text exposition format (one histogram per metric)"""
+    with _lock:
+        metrics = {key: [entry[0], entry[1], entry[2], list(entry[3])] for key, entry in _metrics.items()}
+    lines = []
+    for name in sorted({key[0] for key in metrics}):
+        metric = f"jobtrend_{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for (key_name, labels), (count, total, _, counts) in sorted(metrics.items()):
+            if key_name != name:
+                continue
+            for bound, hits in zip(buckets(name), counts):
+                lines.append(f"{metric}_bucket{_labels(labels, [('le', bound)])} {hits}")
+            lines.append(f"{metric}_bucket{_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        lines.append(f"# TYPE {metric}_max gauge")
+        for (key_name, labels), (_, _, largest, _) in sorted(metrics.items()):
+            if key_name == name:
+                lines.append(f"{metric}_max{_labels(labels)} {largest}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics(path=METRICS_PATH):
+    """Write the metrics file atomically, so a node exporter never reads half of it"""
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(prometheus_text())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def dump_profiles(directory=PROFILE_DIR):
+    """Write the kept profiles of the slowest pages, slowest first, and return their paths"""
+    with _lock:
+        profiles = sorted(_profiles, reverse=True)
+    paths = []
+    if profiles:
+        os.makedirs(directory, exist_ok=True)
+    for rank, (seconds, _, name, attrs, text) in enumerate(profiles, 1):
+        path = os.path.join(directory, f"{rank:02d}-{name}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"{name} {json.dumps(attrs, default=str)} took {seconds:.2f}s\n\n{text}")
+        paths.append(path)
+    return paths
+
+
+def flush():
+    """Write traces, metrics and profiles collected so far (also done at exit)"""
+    global _last_flush
+    with _lock:
+        _last_flush = time.monotonic()
+    with _write_lock:
+        write_traces()
+        if _metrics:
+            write_metrics()
+        dump_profiles()
+
+
+def _flush_at_exit():
+    if _is_main_process():
+        _safe_flush()
+
+
+atexit.register(_flush_at_exit)
+
+
+def summarize_traces(path=TRACE_PATH):
+    """Count, mean, 95th percentile and slowest duration per span name in a trace file"""
+    import pandas as pd
+    spans = pd.read_json(path, lines=True)
+    grouped = spans.groupby('name')['seconds']
+    return pd.DataFrame({
+        'count': grouped.count(),
+        'mean_s': grouped.mean(),
+        'p95_s': grouped.quantile(0.95),
+        'max_s': grouped.max(),
+    }).sort_values('max_s', ascending=False)
+
+
+if __name__ == "__main__":
+    # Usage: python instrument.py [traces.jsonl]
+    import sys
+    print(summarize_traces(*sys.argv[1:2]).round(3).to_string())
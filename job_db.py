@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import sys
+import pandas as pd
+import pyarrow.parquet as pq
+import data_loader
+from skills import default_matcher
+
+# Embedded SQLite file the dashboard can query instead of in-memory pandas
+DB_PATH = 'jobs.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT NOT NULL,
+    job_title TEXT,
+    company_name TEXT,
+    location TEXT,
+    skills TEXT,
+    scrapped_date TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS batches (batch TEXT PRIMARY KEY, rows INTEGER);
+CREATE INDEX IF NOT EXISTS jobs_date ON jobs(scrapped_date);
+CREATE INDEX IF NOT EXISTS jobs_location ON jobs(location, scrapped_date);
+CREATE INDEX IF NOT EXISTS jobs_source ON jobs(source, scrapped_date);
+CREATE INDEX IF NOT EXISTS jobs_title ON jobs(job_title);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs(batch);
+CREATE INDEX IF NOT EXISTS job_skills_job ON job_skills(job_id);
+"""
+
+_COLUMNS = ['job_title', 'company_name', 'location', 'skills', 'scrapped_date', 'source']
+
+# Dashboard dimensions and the column each one counts
+DIMENSIONS = {'title': 'job_title', 'location': 'location', 'company': 'company_name', 'source': 'source'}
+
+
+def _value(value):
+    return None if pd.isna(value) else str(value)
+
+
+class JobDB:
+    """Standardized postings in an embedded SQLite file, indexed for filtering.
+
+    Rows are loaded in batches (a job store part, or a CSV at a given
+    content hash). sync() loads batches that are new and drops those that
+    are gone, so the file follows its inputs without being rebuilt. Skills
+    are matched once at load time into the job_skills bridge table.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def batches(self):
+        return {row[0] for row in self.conn.execute("SELECT batch FROM batches")}
+
+    def load(self, batch, df):
+        """Insert a standardized frame as one batch; returns False if it is already loaded"""
+        if batch in self.batches():
+            return False
+        matcher = default_matcher()
+        with self.conn:
+            for row in df.reindex(columns=_COLUMNS).itertuples(index=False):
+                date = row.scrapped_date
+                cursor = self.conn.execute(
+                    "INSERT INTO jobs (batch, job_title, company_name, location, skills, scrapped_date, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (batch, _value(row.job_title), _value(row.company_name), _value(row.location),
+                     _value(row.skills), None if pd.isna(date) else pd.Timestamp(date).date().isoformat(),
+                     _value(row.source)))
+                if not pd.isna(row.skills):
+                    self.conn.executemany("INSERT OR IGNORE INTO job_skills VALUES (?, ?)",
+                                          [(cursor.lastrowid, skill) for skill in matcher.extract(str(row.skills))])
+            self.conn.execute("INSERT INTO batches VALUES (?, ?)", (batch, len(df)))
+        return True
+
+    def drop(self, batch):
+        """Remove a batch and its skill rows"""
+        with self.conn:
+            self.conn.execute("DELETE FROM jobs WHERE batch = ?", (batch,))
+            self.conn.execute("DELETE FROM batches WHERE batch = ?", (batch,))
+
+    def sync(self, sources=None):
+        """Make the loaded batches match the job store (or the given CSV sources)"""
+        import job_store
+        wanted = {}
+        if sources is None and job_store.has_data():
+            for path in job_store.part_files():
+                wanted[os.path.basename(path)] = lambda path=path: _part_frame(path)
+        else:
+            for path, source in (sources or data_loader.DEFAULT_SOURCES).items():
+                batch = f"{path}@{data_loader.file_fingerprint(path)[2]}"
+                wanted[batch] = lambda path=path, source=source: \
+                    data_loader.clean_and_standardize(pd.read_csv(path), source)
+
+        loaded = self.batches()
+        for batch in loaded - set(wanted):
+            self.drop(batch)
+        for batch in set(wanted) - loaded:
+            self.load(batch, wanted[batch]())
+        if loaded != set(wanted):
+            self.conn.execute("ANALYZE")
+        return self
+
+    def _where(self, start=None, end=None, locations=None, sources=None, skill=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("j.scrapped_date >= ?")
+            params.append(pd.Timestamp(start).date().isoformat())
+        if end is not None:
+            clauses.append("j.scrapped_date <= ?")
+            params.append(pd.Timestamp(end).date().isoformat())
+        if locations:
+            clauses.append(f"j.location IN ({', '.join('?' * len(locations))})")
+            params.extend(locations)
+        if sources:
+            clauses.append(f"j.source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        if skill:
+            clauses.append("j.id IN (SELECT job_id FROM job_skills WHERE skill = ?)")
+            params.append(skill)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def top_values(self, dimension, n=5, **filters):
+        """Most frequent values of a dimension, shaped like aggregates.top_values"""
+        where, params = self._where(**filters)
+        if dimension == 'skill':
+            sql = f"SELECT s.skill, COUNT(*) FROM job_skills s JOIN jobs j ON j.id = s.job_id{where} GROUP BY s.skill"
+        else:
+            column = DIMENSIONS[dimension]
+            where += (" AND " if where else " WHERE ") + f"j.{column} IS NOT NULL"
+            sql = f"SELECT j.{column}, COUNT(*) FROM jobs j{where} GROUP BY j.{column}"
+        sql += " ORDER BY COUNT(*) DESC"
+        if n:
+            sql += f" LIMIT {int(n)}"
+        rows = self.conn.execute(sql, params).fetchall()
+        counts = pd.Series([r[1] for r in rows], index=[r[0] for r in rows], name='count', dtype='int64')
+        return counts.rename_axis(dimension)
+
+    def timeline(self, **filters):
+        """Postings per day, shaped like aggregates.timeline"""
+        where, params = self._where(**filters)
+        where += (" AND " if where else " WHERE ") + "j.scrapped_date IS NOT NULL"
+        df = pd.read_sql_query(
+            f"SELECT j.scrapped_date AS Date, COUNT(*) AS Postings FROM jobs j{where} "
+            "GROUP BY j.scrapped_date ORDER BY j.scrapped_date", self.conn, params=params)
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+    def postings(self, columns=None, limit=None, title=None, **filters):
+        """Matching rows as a DataFrame, read without loading the rest of the table"""
+        where, params = self._where(**filters)
+        if title is not None:
+            where += (" AND " if where else " WHERE ") + "j.job_title = ?"
+            params.append(title)
+        select = ', '.join(f"j.{c}" for c in (columns or _COLUMNS))
+        sql = f"SELECT {select} FROM jobs j{where} ORDER BY j.scrapped_date DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        if 'scrapped_date' in df.columns:
+            df['scrapped_date'] = pd.to_datetime(df['scrapped_date'])
+        return data_loader.compact(df)
+
+    def distinct(self, dimension):
+        """Sorted distinct values of a dimension, for filter widgets"""
+        if dimension == 'skill':
+            sql = "SELECT DISTINCT skill FROM job_skills ORDER BY skill"
+        else:
+            column = DIMENSIONS[dimension]
+            sql = f"SELECT DISTINCT {column} FROM jobs WHERE {column} IS NOT NULL ORDER BY {column}"
+        return [row[0] for row in self.conn.execute(sql)]
+
+    def date_range(self):
+        low, high = self.conn.execute("SELECT MIN(scrapped_date), MAX(scrapped_date) FROM jobs").fetchone()
+        return (pd.Timestamp(low).date() if low else None, pd.Timestamp(high).date() if high else None)
+
+    def close(self):
+        self.conn.close()
+
+
+def _part_frame(part_path):
+    import job_store
+    return pq.read_table(part_path, schema=job_store.SCHEMA).to_pandas()
+
+
+def open_db(path=DB_PATH, sources=None):
+    """Open the database, synced with the job store or CSV sources"""
+    return JobDB(path).sync(sources)
+
+
+if __name__ == "__main__":
+    # Usage: python job_db.py sync
+    if len(sys.argv) == 2 and sys.argv[1] == 'sync':
+        with open_db() as db:
+            rows = db.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            print(f"{DB_PATH}: {rows} postings in {len(db.batches())} batches")
+    else:
+        print("Usage: python job_db.py sync")
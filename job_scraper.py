@@ -1,14 +1,18 @@
-import time
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from driver_pool import driver_path
+from scrape_profile import apply_scrape_profile, measure_page
+from job_store import append_jobs
+from indeed_parser import parse_indeed
+from seen_index import SeenIndex
+from waits import wait_for_stable_count
+from instrument import span
 
-# Initialize lists for data storage
-jobs_data = []
+# Any of the card layouts Indeed has used
+INDEED_CARD_SELECTOR = "#mosaic-provider-jobcards li, .job_seen_beacon, .jobCard, .job-card"
 
 def setup_driver():
     """Set up and configure the Chrome WebDriver"""
@@ -24,14 +28,17 @@ def setup_driver():
     options.add_experimental_option("useAutomationExtension", False)
     
     # Create and return the driver
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(driver_path()), options=options)
     # Disguise webdriver usage
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Skip images, fonts, media and trackers we never read
+    apply_scrape_profile(driver, "indeed")
     return driver
 
-def scrape_indeed():
-    """Scrape Indeed for job listings"""
+def scrape_indeed(seen=None):
+    """Scrape Indeed for job listings; with a SeenIndex only new postings are kept"""
     driver = setup_driver()
+    jobs_data = []
     
     # Parameters for the search
     job_title = "python"
@@ -44,102 +51,49 @@ def scrape_indeed():
     
     try:
         # Navigate to Indeed
-        driver.get(search_url)
+        with span('navigate', site='indeed'):
+            driver.get(search_url)
         print("Page loaded, waiting for content...")
-        time.sleep(3)  # Allow time for the page to fully load
+        wait_for_stable_count(driver, INDEED_CARD_SELECTOR, "indeed")
+        page = measure_page(driver, "indeed")
+        print(f"Loaded {page['bytes'] / 1024:.0f} KiB in {page['load_ms'] or 0:.0f} ms")
         
         # Save the page source for debugging
+        page_source = driver.page_source
         with open("indeed_page_source.html", "w", encoding="utf-8") as f:
-            f.write(driver.page_source)
+            f.write(page_source)
             print("Saved page source for debugging")
-        
-        # Parse with BeautifulSoup for easier HTML navigation
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Try to find job cards using multiple possible selectors
-        job_cards = []
-        
-        # Check for the mosaic container first (old Indeed structure)
-        mosaic_container = soup.find("div", {"id": "mosaic-provider-jobcards"})
-        if mosaic_container:
-            print("Found mosaic container")
-            job_cards = mosaic_container.find_all("li")
-        
-        # If that didn't work, try the newer structure
-        if not job_cards:
-            print("Trying alternative job card selectors...")
-            job_cards = soup.select(".job_seen_beacon, .jobCard, .job-card")
-        
-        # If we still don't have job cards, try a more general approach
-        if not job_cards:
-            print("Trying general selectors...")
-            # Look for elements that have job-related content
-            job_cards = [div for div in soup.find_all("div") 
-                        if div.find("h2") or div.find("a", href=lambda h: h and "/rc/clk" in h)]
-        
-        print(f"Found {len(job_cards)} potential job listings")
-        
-        # Process each job card
-        for i, card in enumerate(job_cards):
-            job_info = {}
-            
-            # Try to extract job title with multiple selector patterns
-            try:
-                # Try standard selectors first
-                title_elem = (card.find("h2", {"class": "jobTitle"}) or 
-                             card.find("a", {"class": "jcs-JobTitle"}) or
-                             card.select_one("h2 span"))
-                
-                if title_elem:
-                    job_info["title"] = title_elem.text.strip()
-                else:
-                    # Look for any link that might be a job title
-                    title_link = card.find("a")
-                    if title_link and title_link.text.strip():
-                        job_info["title"] = title_link.text.strip()
-            except Exception as e:
-                print(f"Error extracting job title: {e}")
-            
-            # Try to extract company name
-            try:
-                company_elem = (card.find("span", {"data-testid": "company-name"}) or
-                              card.find("span", {"class": "companyName"}))
-                if company_elem:
-                    job_info["company"] = company_elem.text.strip()
-            except Exception as e:
-                print(f"Error extracting company name: {e}")
-            
-            # Try to extract location
-            try:
-                location_elem = (card.find("div", {"data-testid": "text-location"}) or
-                               card.find("div", {"class": "companyLocation"}))
-                if location_elem:
-                    job_info["location"] = location_elem.text.strip()
-            except Exception as e:
-                print(f"Error extracting location: {e}")
-            
-            # Try to extract job details/description
-            try:
-                details_elem = (card.find("div", {"class": "job-snippet"}) or
-                              card.find("div", {"class": "jobMetaDataGroup"}) or
-                              card.find("div", {"class": "summary"}))
-                if details_elem:
-                    job_info["details"] = details_elem.text.strip()
-            except Exception as e:
-                print(f"Error extracting job details: {e}")
-            
-            # Only add if we have at least a title or company
-            if job_info.get("title") or job_info.get("company"):
-                print(f"Job {i+1}: {job_info.get('title', 'Unknown')} at {job_info.get('company', 'Unknown')}")
-                jobs_data.append(job_info)
+
+        # Parse every job card in one pass over the page
+        records = parse_indeed(page_source)
+
+        print(f"Found {len(records)} job listings")
+
+        for i, record in enumerate(records):
+            job_info = {
+                "title": record.job_title,
+                "company": record.company_name,
+                "location": record.location,
+                "details": record.details,
+                "url": record.url,
+            }
+            job_info = {key: value for key, value in job_info.items() if value}
+            print(f"Job {i+1}: {job_info.get('title', 'Unknown')} at {job_info.get('company', 'Unknown')}")
+            jobs_data.append(job_info)
         
         print(f"Successfully scraped {len(jobs_data)} jobs")
+
+        if seen is not None:
+            jobs_data = seen.filter_new(jobs_data, "Indeed")
+            print(f"{len(jobs_data)} of them are new")
         
-        # Save the data to CSV
+        # Append the data to the job store
         if jobs_data:
             df = pd.DataFrame(jobs_data)
-            df.to_csv("indeed_jobs.csv", index=False)
-            print(f"Data saved to indeed_jobs.csv")
+            part = append_jobs(df, "Indeed")
+            print(f"Data appended to the job store ({part})")
+            if seen is not None:
+                seen.commit()
     
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -149,4 +103,5 @@ def scrape_indeed():
         driver.quit()
 
 if __name__ == "__main__":
-    scrape_indeed()
\ No newline at end of file
+    with SeenIndex() as seen:
+        scrape_indeed(seen)
\ No newline at end of file
@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import data_loader
+from data_loader import clean_and_standardize, compact, CATEGORY_COLUMNS
+import aggregates
+from aggregates import write_summary
+import changes
+from instrument import span
+from locking import file_lock, temp_path
+
+# Directory holding the append-only Parquet parts
+STORE_DIR = data_loader.STORE_DIR
+
+# Fixed schema every part is written with
+SCHEMA = pa.schema([
+    ('job_title', pa.string()),
+    ('company_name', pa.string()),
+    ('location', pa.string()),
+    ('skills', pa.string()),
+    ('scrapped_date', pa.date32()),
+    ('source', pa.string()),
+])
+COLUMNS = SCHEMA.names
+
+# Record (absolute path -> source) of the CSV files already imported into the store
+IMPORTS_NAME = '_imports.json'
+# Lock file held while CSV files are imported, so no file is imported twice
+IMPORTS_LOCK = '_imports.lock'
+
+
+def to_store_frame(df, source):
+    """Standardize a scraped frame and coerce it to the store schema"""
+    return clean_and_standardize(df, source)[COLUMNS]
+
+
+def append_jobs(df, source, store_dir=STORE_DIR):
+    """Append scraped rows as a new immutable part file and return its path"""
+    if os.path.abspath(store_dir) == os.path.abspath(STORE_DIR):
+        seed_from_csv(store_dir)
+    return _write_part(df, source, store_dir)
+
+
+def _write_part(df, source, store_dir, action='append'):
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    with span('write', stage='store', format='parquet', records=len(df)):
+        table = pa.Table.from_pandas(to_store_frame(df, source), schema=SCHEMA, preserve_index=False)
+
+        os.makedirs(store_dir, exist_ok=True)
+        name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(store_dir, name)
+        # Materialize the dashboard counts first; a summary without its part is ignored
+        write_summary(table.to_pandas(), path)
+        # Write under a temporary name so readers never see a half-written part
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        # Update the running dashboard counters with just this batch, then tell live dashboards
+        aggregates.apply_part(path)
+        changes.publish(store_dir, action, path, aggregates.read_summary(path))
+    return path
+
+
+def retract_part(path):
+    """Remove a part ingested by mistake, taking its rows out of the dashboard counters"""
+    summary = aggregates.read_summary(path)
+    aggregates.retract_part(path)
+    os.remove(path)
+    os.remove(aggregates.summary_path(path))
+    changes.publish(os.path.dirname(path), 'retract', path, summary)
+
+
+def part_files(store_dir=STORE_DIR):
+    """Return the sorted list of complete part files in the store"""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(os.path.join(store_dir, name) for name in os.listdir(store_dir)
+                  if name.startswith('part-') and name.endswith('.parquet'))
+
+
+def has_data(store_dir=STORE_DIR):
+    return bool(part_files(store_dir))
+
+
+def store_fingerprint(store_dir=STORE_DIR):
+    """Parts are never rewritten, so their names and sizes identify the store contents"""
+    return tuple((os.path.basename(path), os.path.getsize(path)) for path in part_files(store_dir))
+
+
+def read_jobs(columns=None, store_dir=STORE_DIR):
+    """Read the store into a DataFrame, projecting only the requested columns"""
+    paths = part_files(store_dir)
+    columns = list(columns or COLUMNS)
+    if not paths:
+        return pd.DataFrame(columns=columns)
+
+    table = pq.read_table(paths, columns=columns, schema=SCHEMA, memory_map=True)
+    # Dictionary-encode repetitive columns in Arrow so pandas gets categoricals
+    # directly, without first building a Python string per row
+    for name in CATEGORY_COLUMNS:
+        if name in table.column_names:
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, table.column(name).dictionary_encode())
+    df = table.to_pandas(date_as_object=False)
+    return compact(df)
+
+
+def _imports_path(store_dir):
+    return os.path.join(store_dir, IMPORTS_NAME)
+
+
+def imported_files(store_dir=STORE_DIR):
+    """The CSV files imported into the store so far, as {absolute path: source}"""
+    try:
+        with open(_imports_path(store_dir), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _imports_lock(store_dir):
+    return file_lock(os.path.join(store_dir, IMPORTS_LOCK))
+
+
+def _import_csv(path, source, store_dir):
+    # Published as an 'import': dashboards that were reading the CSV itself must not add it again
+    part = _write_part(pd.read_csv(path, on_bad_lines='skip'), source, store_dir, action='import')
+    imported = imported_files(store_dir)
+    imported[os.path.abspath(path)] = source
+    tmp = temp_path(_imports_path(store_dir))
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(imported, f, indent=1)
+    os.replace(tmp, _imports_path(store_dir))
+    return part
+
+
+def import_csv(path, source, store_dir=STORE_DIR):
+    """Load a scraper CSV into the store and remember it, so it is never imported twice"""
+    with _imports_lock(store_dir):
+        return _import_csv(path, source, store_dir)
+
+
+def seed_from_csv(store_dir=STORE_DIR):
+    """Import the dashboard's CSV files (DEFAULT_SOURCES) that the store does not hold yet.
+
+    Once the store has parts the dashboard reads only the store, so this
+    one-time migration keeps the history scraped before the store existed.
+    Writers run it before their first append; dashboards never do. Returns
+    the files imported.
+    """
+    def pending():
+        imported = imported_files(store_dir)
+        return [(path, source) for path, source in data_loader.DEFAULT_SOURCES.items()
+                if os.path.exists(path) and os.path.abspath(path) not in imported]
+
+    if not pending():
+        return []
+    with _imports_lock(store_dir):
+        # Another writer may have seeded the store while we waited for the lock
+        todo = pending()
+        for path, source in todo:
+            _import_csv(path, source, store_dir)
+    return [path for path, _ in todo]
+
+
+def export_csv(path, columns=None, store_dir=STORE_DIR):
+    """Write the store (or some of its columns) out as CSV"""
+    df = read_jobs(columns, store_dir)
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+if __name__ == "__main__":
+    # Usage: python job_store.py seed
+    #        python job_store.py import <file.csv> <source>
+    #        python job_store.py retract <store part>
+    #        python job_store.py export <file.csv>
+    if len(sys.argv) == 2 and sys.argv[1] == 'seed':
+        for path in seed_from_csv():
+            print(f"Seeded the job store with {path}")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'import':
+        print(f"Imported {sys.argv[2]} into {import_csv(sys.argv[2], sys.argv[3])}")
+    elif len(sys.argv) == 3 and sys.argv[1] == 'retract':
+        retract_part(sys.argv[2])
+        print(f"Retracted {sys.argv[2]}")
+    elif len(sys.argv) == 3 and sys.argv[1] == 'export':
+        print(f"Exported {export_csv(sys.argv[2])} rows to {sys.argv[2]}")
+    else:
+        print("Usage: python job_store.py seed | import <file.csv> <source> | retract <part> | export <file.csv>")
@@ -0,0 +1,164 @@
+import os
+import re
+import csv
+import json
+import hashlib
+from collections import namedtuple
+from functools import lru_cache
+import pandas as pd
+
+# Bundled place names: countries, regions (with their codes) and cities
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.csv')
+# Parsed locations, keyed by the raw string, kept between runs
+CACHE_PATH = 'location_cache.json'
+# Bump when parse_location changes, so cached results are parsed again
+PARSER_VERSION = 1
+
+Location = namedtuple('Location', ['city', 'region', 'country', 'work_mode'])
+FIELDS = list(Location._fields)
+
+_WORK_MODES = [('hybrid', re.compile(r'\bhybrid\b')),
+               ('remote', re.compile(r'\b(?:remote|work from home|wfh)\b')),
+               ('onsite', re.compile(r'\bon[\s-]?site\b'))]
+# Noise around the place name: work-mode prefixes, postcodes, "(Midtown area)", "Metropolitan Area"
+_NOISE = [re.compile(p) for p in (
+    r'\((?:[^)]*)\)',
+    r'\b(?:hybrid|remote|on[\s-]?site)(?:\s+work)?(?:\s+in)?\b',
+    r'\b(?:work from home|wfh)\b',
+    r'\b\d{5}(?:-\d{4})?\b',
+    r'\b(?:greater|metropolitan|metro|area|region|county|division|district|city of)\b',
+)]
+
+
+class Gazetteer:
+    """Name lookups over the bundled gazetteer file"""
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.countries = {}
+        self.regions = {}
+        self.cities = {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                names = [row['name'], row['code']] + row['aliases'].split('|')
+                table = {'country': self.countries, 'region': self.regions, 'city': self.cities}[row['kind']]
+                for name in names:
+                    if name:
+                        table.setdefault(_key(name), []).append(row)
+        with open(path, 'rb') as f:
+            self.version = hashlib.sha1(f.read()).hexdigest()
+
+    def city(self, name, region=None, country=None):
+        for row in self.cities.get(_key(name), []):
+            if (region is None or row['region'] == region) and (country is None or row['country'] == country):
+                return row
+        return None
+
+
+def _key(name):
+    return ' '.join(re.sub(r'[.]', '', name.lower()).split()).strip(' -–')
+
+
+@lru_cache(maxsize=None)
+def gazetteer():
+    return Gazetteer()
+
+
+@lru_cache(maxsize=65536)
+def parse_location(text):
+    """Split a raw location string into a Location, using the gazetteer only (no network)"""
+    if not isinstance(text, str) or not text.strip():
+        return Location(None, None, None, None)
+    lowered = text.lower()
+    work_mode = next((mode for mode, pattern in _WORK_MODES if pattern.search(lowered)), None)
+    for pattern in _NOISE:
+        lowered = pattern.sub(' ', lowered)
+    parts = [_key(part) for part in re.split(r'[,;|/]|\s[-–]\s', lowered)]
+    parts = [part for part in parts if part]
+
+    places = gazetteer()
+    city = region = country = None
+    # Read from the end: "<city>, <region>, <country>" with any of them left out
+    while parts:
+        part = parts[-1]
+        if country is None and region is None and part in places.countries:
+            country = places.countries[part][0]['country']
+            parts.pop()
+            continue
+        if region is None and part in places.regions:
+            # A lone name that is also a city ("New York") is read as the city
+            if len(parts) == 1 and places.city(part, None, country):
+                break
+            match = [row for row in places.regions[part] if country in (None, row['country'])]
+            if match:
+                region, country = match[0]['region'], match[0]['country']
+                parts.pop()
+                continue
+        break
+
+    if parts:
+        name = parts[0]
+        row = places.city(name, region, country) or places.city(name, None, country)
+        if row:
+            city, region, country = row['name'], row['region'] or region, row['country']
+        else:
+            # A place the gazetteer does not list
+            city = name.title()
+    return Location(city, region, country, work_mode)
+
+
+def _load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        cache = json.load(f)
+    if cache.get('version') != [PARSER_VERSION, gazetteer().version]:
+        return {}
+    return cache['locations']
+
+
+def _save_cache(path, locations):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': [PARSER_VERSION, gazetteer().version], 'locations': locations}, f)
+    os.replace(path + '.tmp', path)
+
+
+def normalize_locations(locations, cache_path=CACHE_PATH):
+    """City, region, country and work mode for a Series of raw locations.
+
+    Only distinct strings are parsed (a categorical's categories, when
+    given one), and results are kept in cache_path for later runs.
+    """
+    values = locations.astype('category')
+    distinct = [str(value) for value in values.cat.categories]
+    cache = _load_cache(cache_path) if cache_path else {}
+    missing = [value for value in distinct if value not in cache]
+    for value in missing:
+        cache[value] = list(parse_location(value))
+    if missing and cache_path:
+        _save_cache(cache_path, cache)
+
+    parsed = pd.DataFrame([cache[value] for value in distinct], columns=FIELDS)
+    codes = values.cat.codes.to_numpy()
+    result = {}
+    for field in FIELDS:
+        # Per-row values are codes into the distinct results; code -1 (missing) maps to NA
+        column = pd.Categorical(parsed[field].astype(object).tolist() + [None])
+        result[field] = pd.Categorical.from_codes(column.codes[codes], categories=column.categories)
+    return pd.DataFrame(result, index=locations.index)
+
+
+def city_label(location):
+    """Label for the city chart, e.g. "Jersey City, New Jersey"; None when there is no city"""
+    if pd.isna(location.city):
+        return None
+    place = location.region if not pd.isna(location.region) else location.country
+    return location.city if pd.isna(place) else f"{location.city}, {place}"
+
+
+def group_by_city(counts):
+    """Re-total counts indexed by raw location (e.g. top_values(..., n=None)) per normalized city"""
+    parsed = normalize_locations(pd.Series(list(counts.index), dtype=object)).astype(object)
+    labels = [city_label(Location(*row)) for row in parsed.itertuples(index=False, name=None)]
+    grouped = pd.Series(counts.to_numpy(), index=labels, dtype='int64')
+    grouped = grouped[grouped.index.notna()].groupby(level=0).sum()
+    return grouped.sort_values(ascending=False, kind='stable').rename('count').rename_axis('location')
@@ -0,0 +1,44 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def temp_path(path):
+    """A temporary name next to path that no other process or thread writes to"""
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path (created if missing) across processes and threads.
+
+    The lock belongs to the open file, so threads of one process that each
+    enter file_lock() also wait for each other.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after about 10 seconds; keep waiting
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+from job_store import append_jobs
+from instrument import span
+
+
+def _fsync_dir(path):
+    """Make a rename inside path durable (a no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JobSink:
+    """Stream scraped records to disk in batches, with resumable checkpoints.
+
+    fmt is 'jsonl' (path is a file that records are appended to) or 'store'
+    (path is a job store directory, see job_store.py). Records are held in
+    memory only until batch_size of them are buffered.
+
+    Checkpoints record, per crawl task (e.g. "query|location"), the last page
+    whose records were flushed. They are written after the data, so a resumed
+    crawl never skips a page that was not saved.
+    """
+
+    def __init__(self, path, source, fmt='jsonl', batch_size=100, checkpoint_path=None, resume=False):
+        self.path = path
+        self.source = source
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path or f"{path.rstrip('/')}.checkpoint.json"
+        self.buffer = []
+        self.written = 0
+        self.state = {'tasks': {}, 'records_written': 0}
+        if resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                self.state = json.load(f)
+            self.written = self.state.get('records_written', 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, records):
+        self.buffer.extend(records)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write out buffered records and fsync them"""
+        if not self.buffer:
+            return
+        with span('write', stage='sink', format=self.fmt, records=len(self.buffer)):
+            if self.fmt == 'jsonl':
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    for record in self.buffer:
+                        f.write(json.dumps(record, default=str) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+            elif self.fmt == 'store':
+                # Store parts are written to a temporary name and renamed into place
+                append_jobs(self.buffer, self.source, self.path)
+            else:
+                raise ValueError(f"Unknown sink format: {self.fmt}")
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def checkpoint(self, task, page, finished=False):
+        """Flush, then durably record that task has been crawled up to page"""
+        self.flush()
+        self.state['tasks'][task] = {'page': page, 'finished': finished, 'time': time.time()}
+        self.state['records_written'] = self.written
+
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        _fsync_dir(os.path.dirname(self.checkpoint_path))
+
+    def resume_page(self, task):
+        """Page a task should start from: 0 when new, None when it already finished"""
+        progress = self.state['tasks'].get(task)
+        if progress is None:
+            return 0
+        if progress['finished']:
+            return None
+        return progress['page'] + 1
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,231 @@
+import sys
+import time
+import queue
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http_fetch import AsyncFetcher
+from instrument import observe
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def parse_indeed_page(html):
+    """Indeed page -> job records, with the card parser and fallbacks of gpt_indeed.py"""
+    from gpt_indeed import extract_jobs
+    return extract_jobs(html, verbose=False)
+
+
+def parse_rozee_page(html):
+    """Rozee search page -> job records, as checker.py builds them"""
+    from card_selectors import parse_cards
+    from checker import jobs_from_cards
+    return jobs_from_cards(parse_cards(html, "rozee"))
+
+
+def _timed_parse(parse, html):
+    start = time.perf_counter()
+    records = parse(html)
+    return records, time.perf_counter() - start
+
+
+# Page parsers by site; they run in worker processes, so they must be module-level functions
+PARSERS = {"indeed": parse_indeed_page, "rozee": parse_rozee_page}
+
+
+class Pipeline:
+    """Fetch, parse and write pages as three concurrent stages.
+
+    A fetch thread produces (url, html) pages, either fetched over HTTP
+    (run_urls) or taken from any iterable such as a Selenium crawl (run).
+    Pages go through a bounded queue to a process pool that parses them,
+    and records go through another bounded queue to a writer (on the
+    calling thread) that filters them through a SeenIndex (optional) and writes them to a
+    JobSink. A full queue blocks the stage feeding it, so a slow writer
+    slows down parsing and fetching instead of piling up pages in memory.
+
+    stats holds per-stage items, busy seconds and seconds spent blocked
+    on a full queue; queue depths are sampled every sample_interval.
+    """
+
+    def __init__(self, parse, sink, seen=None, workers=2, queue_size=16, sample_interval=0.1):
+        self.parse = parse
+        self.sink = sink
+        self.seen = seen
+        self.workers = workers
+        self.pages = queue.Queue(queue_size)
+        self.records = queue.Queue(queue_size)
+        self.sample_interval = sample_interval
+        self.stats = {stage: {"items": 0, "busy_seconds": 0.0, "blocked_seconds": 0.0}
+                      for stage in ("fetch", "parse", "write")}
+        self.depths = {"pages": [], "records": []}
+        self.errors = []
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+
+    def _put(self, q, item, stage):
+        """Put item on q, waiting while it is full; returns False if the pipeline is stopping"""
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.stats[stage]["blocked_seconds"] += time.perf_counter() - start
+        return not self._stop.is_set()
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _stage(self, stage, body, downstream=None):
+        """Run a stage body, recording its error and always ending its output"""
+        try:
+            body()
+        except Exception as e:
+            self.errors.append((stage, e))
+            self._stop.set()
+        finally:
+            if downstream is not None:
+                self._put(downstream, _DONE, stage)
+
+    def _fetch_iterable(self, pages):
+        pages = iter(pages)
+        while True:
+            start = time.perf_counter()
+            page = next(pages, None)
+            self.stats["fetch"]["busy_seconds"] += time.perf_counter() - start
+            if page is None:
+                return
+            self.stats["fetch"]["items"] += 1
+            if not self._put(self.pages, page, "fetch"):
+                return
+
+    def _fetch_urls(self, urls, fetch_options):
+        async def worker(fetcher, todo):
+            loop = asyncio.get_running_loop()
+            while todo and not self._stop.is_set():
+                result = await fetcher.fetch(todo.popleft())
+                self.stats["fetch"]["items"] += 1
+                self.stats["fetch"]["busy_seconds"] += result.elapsed
+                if result.error or result.text is None:
+                    print(f"Fetch failed for {result.url}: {result.error or result.status}")
+                    continue
+                # Blocks this fetcher (not the event loop) while the page queue is full
+                await loop.run_in_executor(None, self._put, self.pages, (result.url, result.text), "fetch")
+
+        async def run():
+            todo = deque(urls)
+            async with AsyncFetcher(**fetch_options) as fetcher:
+                concurrency = min(fetcher.per_host, len(todo)) or 1
+                await asyncio.gather(*(worker(fetcher, todo) for _ in range(concurrency)))
+
+        asyncio.run(run())
+
+    def _parse_pages(self):
+        # Worker processes are spawned, so they start clean of this process's threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            pending = deque()
+
+            def collect(block=False):
+                # Pass parsed pages on in order; wait for the oldest while too many are in flight
+                while pending and (block or pending[0].done() or len(pending) >= 2 * self.workers):
+                    records, seconds = pending.popleft().result()
+                    self.stats["parse"]["items"] += 1
+                    self.stats["parse"]["busy_seconds"] += seconds
+                    # Spans recorded in the worker processes stay there, so report parse time from here
+                    observe("parse_seconds", seconds, stage="pipeline")
+                    observe("cards_per_page", len(records), stage="pipeline")
+                    if not self._put(self.records, records, "parse"):
+                        return
+
+            while True:
+                page = self._get(self.pages)
+                if page is _DONE:
+                    break
+                pending.append(pool.submit(_timed_parse, self.parse, page[1]))
+                collect()
+            collect(block=True)
+
+    def _write_records(self):
+        while True:
+            records = self._get(self.records)
+            if records is _DONE:
+                break
+            start = time.perf_counter()
+            if self.seen is not None:
+                records = self.seen.filter_new(records, self.sink.source)
+            self.sink.write(records)
+            self.stats["write"]["items"] += len(records)
+            self.stats["write"]["busy_seconds"] += time.perf_counter() - start
+        self.sink.flush()
+        if self.seen is not None:
+            self.seen.commit()
+
+    def _sample(self, done):
+        while not done.wait(self.sample_interval):
+            self.depths["pages"].append(self.pages.qsize())
+            self.depths["records"].append(self.records.qsize())
+
+    def run(self, pages, fetch=None):
+        """Run the pipeline over an iterable of (url, html) pages; returns the records written"""
+        fetch = fetch or (lambda: self._fetch_iterable(pages))
+        start = time.perf_counter()
+        written = self.stats["write"]["items"]
+        sampling = threading.Event()
+        threads = [
+            threading.Thread(target=self._stage, args=("fetch", fetch, self.pages)),
+            threading.Thread(target=self._stage, args=("parse", self._parse_pages, self.records)),
+            threading.Thread(target=self._sample, args=(sampling,), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        # The writer runs on the calling thread, which owns the sink and the SeenIndex connection
+        self._stage("write", self._write_records)
+        for thread in threads[:2]:
+            thread.join()
+        sampling.set()
+        self.elapsed += time.perf_counter() - start
+        if self.errors:
+            stage, error = self.errors[0]
+            raise RuntimeError(f"{stage} stage failed: {error}") from error
+        return self.stats["write"]["items"] - written
+
+    def run_urls(self, urls, **fetch_options):
+        """Fetch urls over HTTP (see http_fetch.AsyncFetcher) and run them through the pipeline"""
+        return self.run(None, fetch=lambda: self._fetch_urls(urls, fetch_options))
+
+    def report(self):
+        print(f"Pipeline: {self.elapsed:.1f}s")
+        for stage, s in self.stats.items():
+            rate = s["items"] / self.elapsed if self.elapsed else 0.0
+            print(f"  {stage:6} {s['items']:6} items ({rate:.1f}/s), busy {s['busy_seconds']:.1f}s, "
+                  f"blocked on a full queue {s['blocked_seconds']:.1f}s")
+        for name, depths in self.depths.items():
+            if depths:
+                print(f"  {name} queue depth: mean {sum(depths) / len(depths):.1f}, "
+                      f"max {max(depths)} of {getattr(self, name).maxsize}")
+
+
+if __name__ == "__main__":
+    # Usage: python pipeline.py <indeed|rozee> <out.jsonl> <url> [<url> ...]
+    if len(sys.argv) < 4 or sys.argv[1] not in PARSERS:
+        print("Usage: python pipeline.py <indeed|rozee> <out.jsonl> <url> [<url> ...]")
+        sys.exit(1)
+    from output_sink import JobSink
+    from seen_index import SeenIndex
+
+    site, out, urls = sys.argv[1], sys.argv[2], sys.argv[3:]
+    with SeenIndex() as seen, JobSink(out, site.title()) as sink:
+        pipeline = Pipeline(PARSERS[site], sink, seen=seen)
+        print(f"Wrote {pipeline.run_urls(urls)} new jobs to {out}")
+        pipeline.report()
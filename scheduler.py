@@ -0,0 +1,211 @@
+import sys
+import time
+import heapq
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+from sources import ADAPTERS, RECORD_FIELDS
+
+# SQLite file holding the crawl tasks and what each crawl found
+STATE_PATH = 'crawl_schedule.sqlite'
+
+# Recrawl intervals are kept between these bounds (seconds)
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 24 * 60 * 60
+DEFAULT_INTERVAL = 60 * 60
+# A task is recrawled about when it is expected to have this many new postings
+TARGET_NEW = 10
+# Weight of the latest crawl in the smoothed rate of new postings
+SMOOTHING = 0.3
+
+
+def next_interval(rate, interval):
+    """Seconds until the next crawl, given the smoothed rate of new postings per second"""
+    if rate > 0:
+        interval = TARGET_NEW / rate
+    else:
+        # Nothing new lately: back off
+        interval = interval * 2
+    return min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+
+
+class CrawlScheduler:
+    """Keep (source, query, location) crawl tasks fresh, hottest first.
+
+    Every task has its own recrawl interval, derived from a smoothed rate
+    of new postings per second: queries that keep producing new postings
+    are crawled more often, quiet ones back off up to MAX_INTERVAL. Due
+    tasks wait in a priority queue ordered by that rate, so the budget
+    (crawls running at once) goes to hot queries first. Tasks and their
+    rates are saved in SQLite after every crawl, so a restart picks up
+    where it stopped.
+    """
+
+    def __init__(self, path=STATE_PATH, budget=2, clock=time.time):
+        self.path = path
+        self.budget = budget
+        self.clock = clock
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "source TEXT, query TEXT, location TEXT, "
+            "interval REAL, next_run REAL, last_run REAL, rate REAL DEFAULT 0, "
+            "runs INTEGER DEFAULT 0, failures INTEGER DEFAULT 0, total_new INTEGER DEFAULT 0, last_new INTEGER, "
+            "PRIMARY KEY (source, query, location))")
+        self.conn.commit()
+        self.adapters = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, source, query, location, interval=DEFAULT_INTERVAL):
+        """Schedule a task (due now); a task that already exists is left as it is"""
+        if source not in ADAPTERS:
+            raise ValueError(f"Unknown source: {source}")
+        self.conn.execute("INSERT OR IGNORE INTO tasks (source, query, location, interval, next_run) "
+                          "VALUES (?, ?, ?, ?, ?)", (source, query, location, interval, self.clock()))
+        self.conn.commit()
+
+    def remove(self, source, query, location):
+        self.conn.execute("DELETE FROM tasks WHERE source = ? AND query = ? AND location = ?",
+                          (source, query, location))
+        self.conn.commit()
+
+    def tasks(self):
+        return pd.read_sql_query("SELECT * FROM tasks ORDER BY next_run", self.conn)
+
+    def _queue(self, now):
+        """Priority queue of the due tasks, highest rate of new postings first"""
+        rows = self.conn.execute("SELECT rate, next_run, source, query, location FROM tasks WHERE next_run <= ?",
+                                 (now,)).fetchall()
+        queue = [(-rate, next_run, (source, query, location)) for rate, next_run, source, query, location in rows]
+        heapq.heapify(queue)
+        return queue
+
+    def _next_due(self, running):
+        """When the next task that is not running now is due (None without one)"""
+        rows = self.conn.execute("SELECT next_run, source, query, location FROM tasks")
+        return min((row[0] for row in rows if row[1:] not in running), default=None)
+
+    def _adapter(self, source):
+        if source not in self.adapters:
+            adapter = ADAPTERS[source]()
+            if adapter.uses_browser:
+                from driver_pool import DriverPool
+                adapter.pool = DriverPool(size=self.budget, site=adapter.site)
+            self.adapters[source] = adapter
+        return self.adapters[source]
+
+    def _crawl(self, adapter, task):
+        return adapter.search(task[1], task[2])
+
+    def record(self, task, new, failed=False):
+        """Update a task after a crawl that found new postings (or failed) and schedule its next crawl"""
+        now = self.clock()
+        interval, last_run, rate, failures = self.conn.execute(
+            "SELECT interval, last_run, rate, failures FROM tasks WHERE source = ? AND query = ? AND location = ?",
+            task).fetchone()
+        if failed:
+            # Retry with a growing delay, without letting the failure change the rate
+            delay = min(MIN_INTERVAL * 2 ** failures, MAX_INTERVAL)
+            self.conn.execute("UPDATE tasks SET failures = failures + 1, next_run = ? "
+                              "WHERE source = ? AND query = ? AND location = ?",
+                              (now + delay, *task))
+        else:
+            # Postings found now appeared since the last crawl (or over one interval for a first crawl)
+            window = max(now - (last_run or now - interval), 1.0)
+            rate = SMOOTHING * (new / window) + (1 - SMOOTHING) * rate if last_run else new / window
+            interval = next_interval(rate, interval)
+            self.conn.execute(
+                "UPDATE tasks SET interval = ?, next_run = ?, last_run = ?, rate = ?, runs = runs + 1, "
+                "total_new = total_new + ?, last_new = ? WHERE source = ? AND query = ? AND location = ?",
+                (interval, now + interval, now, rate, new, new, *task))
+        self.conn.commit()
+        return interval
+
+    def _save(self, task, records, seen):
+        """Keep the unseen postings of a crawl in the job store; returns how many there were"""
+        from job_store import append_jobs
+        source = self._adapter(task[0]).name
+        if seen is not None:
+            records = seen.filter_new(records, source)
+        if records:
+            append_jobs(pd.DataFrame(records, columns=RECORD_FIELDS), source)
+            if seen is not None:
+                seen.commit()
+        return len(records)
+
+    def run(self, seen=None, max_crawls=None, sleep=time.sleep):
+        """Crawl due tasks until interrupted (or after max_crawls crawls)"""
+        crawls = 0
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.budget) as executor:
+            try:
+                while True:
+                    # Start the due tasks, hottest first, while there is budget left
+                    queue = self._queue(self.clock())
+                    while queue and len(running) < self.budget and (max_crawls is None or crawls < max_crawls):
+                        task = heapq.heappop(queue)[2]
+                        if task in running.values():
+                            continue
+                        print(f"Crawling {task[0]}: {task[1]!r} in {task[2]}")
+                        running[executor.submit(self._crawl, self._adapter(task[0]), task)] = task
+                        crawls += 1
+
+                    if not running and max_crawls is not None and crawls >= max_crawls:
+                        break
+                    # Wake up when a crawl finishes or the next task is due (at least once a minute)
+                    due = self._next_due(set(running.values()))
+                    timeout = 60
+                    if len(running) < self.budget and due is not None:
+                        timeout = min(max(due - self.clock(), 0.1), 60)
+                    if not running:
+                        sleep(timeout)
+                        continue
+
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = running.pop(future)
+                        try:
+                            new = self._save(task, future.result(), seen)
+                            interval = self.record(task, new)
+                            print(f"{task[0]}: {task[1]!r} in {task[2]}: {new} new, "
+                                  f"next crawl in {interval / 60:.0f} min")
+                        except Exception as e:
+                            self.record(task, 0, failed=True)
+                            print(f"{task[0]}: {task[1]!r} in {task[2]} failed: {e}")
+            except KeyboardInterrupt:
+                print("Stopping after the running crawls...")
+                for future in running:
+                    future.cancel()
+
+    def close(self):
+        for adapter in self.adapters.values():
+            if adapter.pool is not None:
+                adapter.pool.close()
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    # Usage: python scheduler.py add <source> <query> <location>
+    #        python scheduler.py remove <source> <query> <location>
+    #        python scheduler.py list
+    #        python scheduler.py run [budget]
+    args = sys.argv[1:]
+    with CrawlScheduler() as scheduler:
+        if len(args) == 4 and args[0] == 'add':
+            scheduler.add(*args[1:])
+        elif len(args) == 4 and args[0] == 'remove':
+            scheduler.remove(*args[1:])
+        elif args == ['list']:
+            print(scheduler.tasks().to_string(index=False))
+        elif args and args[0] == 'run' and len(args) <= 2:
+            from seen_index import SeenIndex
+            scheduler.budget = int(args[1]) if len(args) == 2 else scheduler.budget
+            with SeenIndex() as seen:
+                scheduler.run(seen)
+        else:
+            print("Usage: python scheduler.py add|remove <source> <query> <location> | list | run [budget]")
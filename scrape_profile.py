@@ -0,0 +1,98 @@
+from urllib.parse import urlsplit
+from instrument import observe
+
+# URL patterns for each resource type we never read
+TYPE_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.avif*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.m3u8*', '*.ogg*'],
+}
+
+# Ad, analytics and tracking hosts blocked on every site
+THIRD_PARTY_HOSTS = [
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'google-analytics.com',
+    'googletagmanager.com', 'googletagservices.com', 'facebook.net', 'connect.facebook.net',
+    'hotjar.com', 'scorecardresearch.com', 'quantserve.com', 'adnxs.com', 'criteo.com',
+    'taboola.com', 'outbrain.com', 'bat.bing.com', 'clarity.ms', 'newrelic.com', 'nr-data.net',
+]
+
+# Per-site allow/deny lists. deny_hosts adds hosts to THIRD_PARTY_HOSTS and
+# allow_hosts exempts hosts from it. Stylesheets are kept everywhere because
+# Selenium's .text depends on which elements CSS makes visible.
+SITE_PROFILES = {
+    'rozee': {'block_types': ['image', 'font', 'media'], 'deny_hosts': [], 'allow_hosts': []},
+    'indeed': {'block_types': ['image', 'font', 'media'], 'deny_hosts': [], 'allow_hosts': []},
+    'linkedin': {'block_types': ['image', 'font', 'media'],
+                 'deny_hosts': ['ads.linkedin.com', 'px.ads.linkedin.com', 'snap.licdn.com'], 'allow_hosts': []},
+    'default': {'block_types': ['image', 'font', 'media'], 'deny_hosts': [], 'allow_hosts': []},
+}
+
+# One entry per measured page: site, url, bytes transferred, load time and resource count
+page_log = []
+
+
+def blocked_patterns(site):
+    """URL patterns to block for a site's profile"""
+    profile = SITE_PROFILES.get(site, SITE_PROFILES['default'])
+    patterns = []
+    for resource_type in profile['block_types']:
+        patterns.extend(TYPE_PATTERNS[resource_type])
+
+    allowed = set(profile['allow_hosts'])
+    for host in THIRD_PARTY_HOSTS + profile['deny_hosts']:
+        if host not in allowed:
+            patterns.append(f'*://{host}/*')
+            patterns.append(f'*.{host}/*')
+    return patterns
+
+
+def apply_scrape_profile(driver, site='default'):
+    """Block the profile's resource types and hosts for the rest of the driver's session"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_patterns(site)})
+
+
+_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return {
+    bytes: bytes,
+    load_ms: nav ? (nav.loadEventEnd || performance.now()) - nav.startTime : null,
+    resources: resources.length
+};
+"""
+
+
+def measure_page(driver, site='default'):
+    """Record bytes transferred and load time for the page currently loaded.
+
+    Cross-origin resources without a Timing-Allow-Origin header report a
+    transfer size of 0, so the byte count is a lower bound.
+    """
+    metrics = driver.execute_script(_METRICS_SCRIPT) or {}
+    entry = {
+        'site': site,
+        'url': driver.current_url,
+        'host': urlsplit(driver.current_url).hostname,
+        'bytes': metrics.get('bytes', 0),
+        'load_ms': metrics.get('load_ms'),
+        'resources': metrics.get('resources', 0),
+    }
+    page_log.append(entry)
+    observe('page_bytes', entry['bytes'], site=site)
+    if entry['load_ms'] is not None:
+        observe('page_load_seconds', entry['load_ms'] / 1000, site=site)
+    return entry
+
+
+def page_summary(site=None):
+    """Page count, total bytes and mean load time, optionally for one site"""
+    entries = [e for e in page_log if site is None or e['site'] == site]
+    times = [e['load_ms'] for e in entries if e['load_ms'] is not None]
+    return {
+        'pages': len(entries),
+        'bytes': sum(e['bytes'] for e in entries),
+        'mean_load_ms': sum(times) / len(times) if times else None,
+    }
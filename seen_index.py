@@ -0,0 +1,119 @@
+import re
+import hashlib
+import sqlite3
+import time
+from urllib.parse import urlsplit, parse_qs
+
+# SQLite file holding the keys of every posting already stored
+INDEX_PATH = 'seen_postings.sqlite'
+
+# Field names the different scrapers use for the same thing
+FIELD_NAMES = {
+    'title': ('job_title', 'title', 'Title'),
+    'company': ('company_name', 'company', 'Company'),
+    'location': ('location', 'Location'),
+    'url': ('url', 'link', 'URL'),
+}
+
+# Redirect links whose only stable part is a job id in the query (Indeed ads without one carry none)
+REDIRECT_PATHS = ('/rc/clk', '/pagead/clk')
+# LinkedIn posting pages: /jobs/view/<id> or /jobs/view/<title-slug>-<id>
+LINKEDIN_JOB = re.compile(r'/jobs/view/(?:[^/]*-)?(\d+)')
+
+
+def _field(record, name):
+    for key in FIELD_NAMES[name]:
+        value = record.get(key)
+        if value:
+            return value
+    return ''
+
+
+def _normalize(value):
+    return ' '.join(str(value).lower().split())
+
+
+def canonical_url(url):
+    """The part of a posting URL that identifies the posting, or None when it has no stable part.
+
+    Tracking parameters change on every visit (LinkedIn refId/trackingId,
+    Indeed click tokens), so postings are keyed on their job id where the
+    site has one, else on the URL without its query and fragment.
+    """
+    if not isinstance(url, str):
+        return None
+    parts = urlsplit(url.strip())
+    query = parse_qs(parts.query)
+    # Indeed's jk (or vjk) is the job key on /viewjob, /rc/clk and /pagead/clk links alike
+    job_key = query.get('jk') or query.get('vjk')
+    if job_key:
+        return f"indeed:{job_key[0]}"
+    match = LINKEDIN_JOB.search(parts.path)
+    if match:
+        return f"linkedin:{match.group(1)}"
+    if query.get('currentJobId'):
+        return f"linkedin:{query['currentJobId'][0]}"
+    if parts.path.rstrip('/') in REDIRECT_PATHS:
+        return None
+    return f"{(parts.hostname or '').lower()}{parts.path.rstrip('/')}" or None
+
+
+def posting_key(record, source):
+    """Stable hash of a posting: its canonical URL when known, else normalized title/company/location/source"""
+    url = canonical_url(_field(record, 'url'))
+    if url:
+        text = f"url\x1f{url}"
+    else:
+        parts = [source] + [_field(record, name) for name in ('title', 'company', 'location')]
+        text = '\x1f'.join(_normalize(part) for part in parts)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class SeenIndex:
+    """Persistent set of posting keys shared by all scrapers.
+
+    New keys are written in a transaction; call commit() once the postings
+    have been stored, so a crashed run does not mark unsaved postings as seen.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "key TEXT PRIMARY KEY, source TEXT, first_seen REAL)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Anything not explicitly committed is rolled back
+        self.close()
+
+    def is_seen(self, record, source):
+        key = posting_key(record, source)
+        return self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def filter_new(self, records, source, mark=True):
+        """Return the records not seen before (also dropping repeats within records)"""
+        new = []
+        keys = set()
+        for record in records:
+            key = posting_key(record, source)
+            if key in keys:
+                continue
+            keys.add(key)
+            if self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is None:
+                new.append((key, record))
+
+        if mark and new:
+            now = time.time()
+            self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)",
+                                  [(key, source, now) for key, _ in new])
+        return [record for _, record in new]
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
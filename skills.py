@@ -0,0 +1,71 @@
+import re
+import pandas as pd
+
+# Skills counted on the dashboard
+DEFAULT_SKILLS = ['Python', 'Java', 'SQL', 'Excel', 'AWS', 'JavaScript', 'C++', 'Power BI', 'Pandas', 'NumPy']
+
+# Characters that count as part of a skill token, so "Java" does not match
+# inside "JavaScript" and "C" does not match inside "C++" or "C#"
+_TOKEN_CHARS = r'\w+#'
+
+
+class SkillMatcher:
+    """Match a skill taxonomy against text with one precompiled regex.
+
+    The taxonomy is either a list of skill names or a dict mapping each
+    canonical skill name to a list of aliases, e.g. {'JavaScript': ['JS']}.
+    """
+
+    def __init__(self, taxonomy=None):
+        taxonomy = taxonomy or DEFAULT_SKILLS
+        if not isinstance(taxonomy, dict):
+            taxonomy = {skill: [] for skill in taxonomy}
+
+        self.skills = list(taxonomy)
+        self._canonical = {}
+        for skill, aliases in taxonomy.items():
+            for name in [skill, *aliases]:
+                self._canonical[name.lower()] = skill
+
+        # Longest names first so "Power BI" wins over a shorter overlapping alias
+        names = sorted(self._canonical, key=len, reverse=True)
+        alternation = '|'.join(re.escape(name) for name in names)
+        self.pattern = re.compile(
+            rf'(?<![{_TOKEN_CHARS}])(?:{alternation})(?![{_TOKEN_CHARS}])', re.IGNORECASE)
+
+    def extract(self, text):
+        """Return the canonical skills found in text, in order of first mention"""
+        if not isinstance(text, str):
+            return []
+        found = dict.fromkeys(self._canonical[m.lower()] for m in self.pattern.findall(text))
+        return list(found)
+
+    def extract_series(self, texts):
+        """Return a Series of skill lists, one per document"""
+        return texts.map(self.extract)
+
+    def count(self, texts):
+        """Count how many documents mention each skill, most common first"""
+        # Scan each distinct text once and weight it by how often it occurs
+        frequency = texts.dropna().astype(str).value_counts()
+        matches = pd.Series(frequency.index).str.findall(self.pattern).explode().dropna()
+        if matches.empty:
+            return pd.Series(dtype='int64', name='count')
+
+        canonical = matches.str.lower().map(self._canonical)
+        # A skill mentioned several times in one document counts once
+        pairs = pd.DataFrame({'doc': canonical.index, 'skill': canonical.values}).drop_duplicates()
+        pairs['weight'] = frequency.values[pairs['doc'].values]
+        counts = pairs.groupby('skill')['weight'].sum().sort_values(ascending=False, kind='stable')
+        return counts.rename('count')
+
+
+_default_matcher = None
+
+
+def default_matcher():
+    """Shared matcher for DEFAULT_SKILLS, compiled on first use"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = SkillMatcher(DEFAULT_SKILLS)
+    return _default_matcher
@@ -0,0 +1,220 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlencode
+import pandas as pd
+from skills import default_matcher
+
+# Fields every adapter's records are mapped to: the job store schema plus the posting URL
+RECORD_FIELDS = ['job_title', 'company_name', 'location', 'skills', 'scrapped_date', 'source', 'url']
+
+# Names the different scrapers use for each field
+FIELD_ALIASES = {
+    'job_title': ('job_title', 'title', 'Title'),
+    'company_name': ('company_name', 'company', 'Company'),
+    'location': ('location', 'Location'),
+    'skills': ('skills', 'Skills'),
+    'scrapped_date': ('scrapped_date', 'date_posted', 'Date Posted', 'date posted'),
+    'url': ('url', 'link', 'URL'),
+}
+# Placeholder values scrapers write for a missing field
+_MISSING = {'', 'N/A', 'n/a', 'None'}
+
+
+def standard_record(raw, source):
+    """Map a scraper's record onto RECORD_FIELDS; skills come from the details text when not given"""
+    record = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((raw[name] for name in aliases if raw.get(name) not in (None, *_MISSING)), None)
+        record[field] = value.strip() if isinstance(value, str) else value
+    if record['skills'] is None and raw.get('details'):
+        record['skills'] = ', '.join(default_matcher().extract(raw['details'])) or None
+    if record['scrapped_date'] is None:
+        record['scrapped_date'] = pd.Timestamp.now().strftime('%Y-%m-%d')
+    record['source'] = source
+    return record
+
+
+class SourceAdapter:
+    """One job site. Subclasses set name and locations and implement fetch().
+
+    fetch(query, location) returns the site's raw records for one search;
+    uses_browser adapters get a driver pool (see driver_pool.py) in
+    self.pool before the runner starts.
+    """
+
+    name = None
+    uses_browser = False
+    locations = ()
+
+    def __init__(self, locations=None, max_pages=1):
+        self.locations = tuple(locations or self.locations)
+        self.max_pages = max_pages
+        self.pool = None
+
+    def fetch(self, query, location):
+        raise NotImplementedError
+
+    def search(self, query, location):
+        return [standard_record(raw, self.name) for raw in self.fetch(query, location)]
+
+
+class RozeeAdapter(SourceAdapter):
+    name = 'Rozee'
+    uses_browser = True
+    site = 'rozee'
+    locations = ('Pakistan',)
+
+    def fetch(self, query, location):
+        from checker import scrape_rozee_jobs
+        return scrape_rozee_jobs(query, location, max_pages=self.max_pages, pool=self.pool)
+
+
+class IndeedAdapter(SourceAdapter):
+    """Indeed over plain HTTP, parsed like gpt_indeed.py"""
+
+    name = 'Indeed'
+    locations = ('New York, NY',)
+
+    def fetch(self, query, location):
+        from http_fetch import fetch_all
+        from gpt_indeed import extract_jobs
+        urls = [f"https://www.indeed.com/jobs?{urlencode({'q': query, 'l': location, 'start': page * 10})}"
+                for page in range(self.max_pages)]
+        records = []
+        # Pages are parsed while they download; extract_jobs only needs the text for its fallbacks
+        for result in fetch_all(urls, tree=True):
+            if result.error or result.status != 200:
+                print(f"Indeed fetch failed for {result.url}: {result.error or result.status}")
+                continue
+            records.extend(r for r in extract_jobs(result.text, verbose=False, tree=result.tree)
+                           if r.get('source') != 'deep_search')
+        return records
+
+
+class LinkedInAdapter(SourceAdapter):
+    """LinkedIn's public job search, harvested like scraping_linkedin.py (no login)"""
+
+    name = 'LinkedIn'
+    uses_browser = True
+    site = 'linkedin'
+    locations = ('United States',)
+
+    def __init__(self, locations=None, max_pages=1, target=200):
+        super().__init__(locations, max_pages)
+        self.target = target
+
+    def fetch(self, query, location):
+        from scraping_linkedin import scrape_linkedin
+        with self.pool.session() as driver:
+            return scrape_linkedin(driver, query, target=self.target, location=location)
+
+
+ADAPTERS = {'rozee': RozeeAdapter, 'indeed': IndeedAdapter, 'linkedin': LinkedInAdapter}
+
+
+def run_sources(adapters, queries, budget=4, seen=None, store=False):
+    """Run every adapter for every query and location, at most budget searches at a time.
+
+    Returns (records, timings): the records in the common schema, limited
+    to unseen postings with a SeenIndex, and per-source timings. With
+    store=True the records are appended to the job store, one part per
+    source, and the SeenIndex is committed afterwards.
+    """
+    from driver_pool import DriverPool
+    for adapter in adapters:
+        if adapter.uses_browser and adapter.pool is None:
+            adapter.pool = DriverPool(size=budget, site=adapter.site)
+
+    tasks = [(adapter, query, location) for adapter in adapters for query in queries
+             for location in adapter.locations]
+    timings = {adapter.name: {'searches': 0, 'failed': 0, 'records': 0, 'seconds': 0.0, 'slowest': 0.0}
+               for adapter in adapters}
+    lock = threading.Lock()
+    results = {}
+
+    def search(task):
+        adapter, query, location = task
+        start = time.perf_counter()
+        try:
+            return adapter.search(query, location)
+        finally:
+            seconds = time.perf_counter() - start
+            with lock:
+                timing = timings[adapter.name]
+                timing['searches'] += 1
+                timing['seconds'] += seconds
+                timing['slowest'] = max(timing['slowest'], seconds)
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=budget) as executor:
+            futures = {executor.submit(search, task): i for i, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                adapter, query, location = tasks[futures[future]]
+                try:
+                    results[futures[future]] = future.result()
+                    timings[adapter.name]['records'] += len(results[futures[future]])
+                    print(f"{adapter.name}: {query!r} in {location}: {len(results[futures[future]])} jobs")
+                except Exception as e:
+                    timings[adapter.name]['failed'] += 1
+                    print(f"{adapter.name}: {query!r} in {location} failed: {e}")
+    finally:
+        for adapter in adapters:
+            if adapter.pool is not None:
+                adapter.pool.close()
+    wall = time.perf_counter() - start
+
+    # Merge in task order so the output does not depend on completion order
+    records = []
+    for i in range(len(tasks)):
+        records.extend(results.get(i, []))
+    if seen is not None:
+        by_source = {}
+        for record in records:
+            by_source.setdefault(record['source'], []).append(record)
+        records = [r for source, group in by_source.items() for r in seen.filter_new(group, source)]
+    if store and records:
+        from job_store import append_jobs
+        df = pd.DataFrame(records, columns=RECORD_FIELDS)
+        for source, group in df.groupby('source'):
+            print(f"Appended {len(group)} {source} jobs to the job store ({append_jobs(group, source)})")
+        if seen is not None:
+            seen.commit()
+    timings['total'] = {'seconds': wall, 'searches': len(tasks), 'records': len(records)}
+    return records, timings
+
+
+def report(timings):
+    total = timings['total']
+    print(f"{total['searches']} searches, {total['records']} new jobs in {total['seconds']:.1f}s")
+    for name, t in timings.items():
+        if name == 'total':
+            continue
+        mean = t['seconds'] / t['searches'] if t['searches'] else 0.0
+        print(f"  {name:9} {t['searches']:3} searches ({t['failed']} failed), {t['records']:5} jobs, "
+              f"{t['seconds']:.1f}s in total, {mean:.1f}s mean, {t['slowest']:.1f}s slowest")
+
+
+if __name__ == "__main__":
+    # Usage: python sources.py <query> [<query> ...] [--sources rozee,indeed,linkedin] [--budget N]
+    args = sys.argv[1:]
+    names = list(ADAPTERS)
+    budget = 4
+    if '--sources' in args:
+        i = args.index('--sources')
+        names = args[i + 1].split(',')
+        del args[i:i + 2]
+    if '--budget' in args:
+        i = args.index('--budget')
+        budget = int(args[i + 1])
+        del args[i:i + 2]
+    if not args:
+        print("Usage: python sources.py <query> [<query> ...] [--sources rozee,indeed,linkedin] [--budget N]")
+        sys.exit(1)
+
+    from seen_index import SeenIndex
+    with SeenIndex() as seen:
+        _, timings = run_sources([ADAPTERS[name]() for name in names], args, budget=budget, seen=seen, store=True)
+    report(timings)
@@ -0,0 +1,33 @@
+import unittest
+import pandas as pd
+from dedupe import cluster_ids
+
+
+def clusters(titles, company="Acme"):
+    df = pd.DataFrame({"job_title": titles, "company_name": [company] * len(titles)})
+    return list(cluster_ids(df))
+
+
+class ClusterIdsTest(unittest.TestCase):
+
+    def test_combined_title_joins_one_alternative_without_chaining_them(self):
+        ids = clusters(["Frontend Developer", "Fullstack Developer", "Front-End / Full-Stack Developer"])
+        self.assertNotEqual(ids[0], ids[1])
+        self.assertIn(ids[2], (ids[0], ids[1]))
+
+    def test_combined_title_matches_its_alternative(self):
+        self.assertEqual(clusters(["Frontend Developer", "Front-End / Full-Stack Developer"]), [0, 0])
+
+    def test_levels_are_different_roles(self):
+        self.assertEqual(clusters(["Software Engineer I", "Software Engineer II"]), [0, 1])
+
+    def test_spelling_variants_are_the_same_role(self):
+        self.assertEqual(clusters(["Sr. Software Engineer", "Senior Software Developer"]), [0, 0])
+
+    def test_other_companies_never_match(self):
+        df = pd.DataFrame({"job_title": ["Python Developer"] * 2, "company_name": ["Acme Inc.", "Globex"]})
+        self.assertEqual(list(cluster_ids(df)), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import gzip
+import asyncio
+import unittest
+from aiohttp import web
+from http_fetch import AsyncFetcher
+
+PAGE = "<html><body>" + "".join(f'<div class="job">Job {i}</div>' for i in range(500)) + "</body></html>"
+
+
+class StubServer:
+    """A local aiohttp server with one handler per test case"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def gzipped(self, request):
+        body = gzip.compress(PAGE.encode("utf-8"))
+        return web.Response(body=body, headers={"Content-Encoding": "gzip", "Content-Type": "text/html"})
+
+    async def slow(self, request):
+        await asyncio.sleep(2)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def counted(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            return web.Response(text=PAGE, content_type="text/html")
+        finally:
+            self.in_flight -= 1
+
+    async def bad_charset(self, request):
+        return web.Response(body=PAGE.encode("utf-8"), headers={"Content-Type": "text/html; charset=x-unknown"})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/gzip", self.gzipped)
+        app.router.add_get("/slow", self.slow)
+        app.router.add_get("/counted/{n}", self.counted)
+        app.router.add_get("/charset", self.bad_charset)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class AsyncFetcherTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = StubServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_gzip_body_is_decoded_and_parsed_while_streaming(self):
+        async with AsyncFetcher() as fetcher:
+            result = await fetcher.fetch(self.server.base + "/gzip", tree=True)
+        self.assertEqual(result.status, 200)
+        self.assertEqual(result.text, PAGE)
+        self.assertEqual(len(result.tree.xpath('//div[@class="job"]')), 500)
+
+    async def test_timeout_is_returned_as_an_error(self):
+        async with AsyncFetcher(timeout=0.2) as fetcher:
+            result = await fetcher.fetch(self.server.base + "/slow")
+        self.assertIsNone(result.status)
+        self.assertIsInstance(result.error, asyncio.TimeoutError)
+
+    async def test_per_host_limit(self):
+        urls = [f"{self.server.base}/counted/{i}" for i in range(12)]
+        async with AsyncFetcher(per_host=3) as fetcher:
+            results = await fetcher.fetch_all(urls)
+        self.assertTrue(all(r.status == 200 for r in results))
+        self.assertEqual(self.server.max_in_flight, 3)
+
+    async def test_unknown_charset_falls_back_to_utf8(self):
+        async with AsyncFetcher() as fetcher:
+            result = await fetcher.fetch(self.server.base + "/charset")
+        self.assertIsNone(result.error)
+        self.assertEqual(result.text, PAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from instrument import span
+
+# Longest time (seconds) any single wait may take on each site
+SITE_TIMEOUTS = {
+    'rozee': 10,
+    'indeed': 15,
+    'linkedin': 15,
+    'default': 10,
+}
+
+# How often conditions are polled (seconds)
+POLL_INTERVAL = 0.1
+
+# A loaded page still showing no cards after this long is taken to have no results (seconds)
+EMPTY_SETTLE = 2.0
+
+# Number of elements matching arguments[0], or null while the page is loading without any
+_COUNT_SCRIPT = """
+var n = document.querySelectorAll(arguments[0]).length;
+return n > 0 ? n : (document.readyState === 'complete' ? 0 : null);
+"""
+
+# One entry per wait: site, condition, seconds actually waited, and whether it was met
+wait_log = []
+
+
+def site_timeout(site):
+    return SITE_TIMEOUTS.get(site, SITE_TIMEOUTS['default'])
+
+
+def _run_wait(driver, site, name, condition, timeout=None):
+    """Poll condition until it is truthy or the site timeout runs out; log how long it took"""
+    timeout = timeout or site_timeout(site)
+    start = time.perf_counter()
+    with span('wait', site=site, condition=name) as fields:
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+            ok = True
+        except TimeoutException:
+            print(f"Timed out after {timeout}s waiting for {name} on {site}")
+            ok = False
+        fields['ok'] = ok
+    wait_log.append({
+        'site': site,
+        'condition': name,
+        'seconds': time.perf_counter() - start,
+        'ok': ok,
+    })
+    return ok
+
+
+def _settled(read, settle, empty_settle=None):
+    """Condition that holds once read(driver) is non-empty and unchanged for settle seconds.
+
+    With empty_settle, a value of 0 unchanged for that long also holds.
+    """
+    state = {'value': None, 'since': None}
+
+    def condition(driver):
+        value = read(driver)
+        now = time.perf_counter()
+        if value != state['value']:
+            state['value'], state['since'] = value, now
+            return False
+        if value:
+            return now - state['since'] >= settle
+        return value == 0 and empty_settle is not None and now - state['since'] >= empty_settle
+
+    return condition
+
+
+def wait_for_selector(driver, selector, site='default', timeout=None):
+    """Wait until an element matching the CSS selector is present"""
+    condition = EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+    return _run_wait(driver, site, f"selector {selector!r}", condition, timeout)
+
+
+def wait_for_stable_count(driver, selector, site='default', settle=0.5, timeout=None):
+    """Wait until at least one card matches the selector and the count stops changing.
+
+    A page that has finished loading and still has no cards after
+    EMPTY_SETTLE seconds (no results, or past the last page) ends the
+    wait early instead of running into the timeout.
+    """
+    condition = _settled(lambda d: d.execute_script(_COUNT_SCRIPT, selector), settle, EMPTY_SETTLE)
+    return _run_wait(driver, site, f"stable count of {selector!r}", condition, timeout)
+
+
+def wait_for_network_idle(driver, site='default', idle=0.5, timeout=None):
+    """Wait until the document has loaded and no new resources arrive for idle seconds"""
+    script = ("return document.readyState === 'complete' ? "
+              "performance.getEntriesByType('resource').length + 1 : 0")
+    condition = _settled(lambda d: d.execute_script(script), idle)
+    return _run_wait(driver, site, "network idle", condition, timeout)
+
+
+def wait_for_staleness(driver, element, site='default', timeout=None):
+    """Wait until element is detached, e.g. after navigating away from its page"""
+    return _run_wait(driver, site, "previous page to unload", EC.staleness_of(element), timeout)
+
+
+def wait_summary():
+    """Total and mean seconds waited per site and condition"""
+    summary = {}
+    for entry in wait_log:
+        key = (entry['site'], entry['condition'])
+        total, count = summary.get(key, (0.0, 0))
+        summary[key] = (total + entry['seconds'], count + 1)
+    return {key: {'total': total, 'mean': total / count, 'count': count}
+            for key, (total, count) in summary.items()}